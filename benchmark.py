@@ -0,0 +1,430 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+try:
+    import resource  # 최대 RSS 측정용 (유닉스 전용)
+except ImportError:
+    resource = None
+
+import numpy as np
+
+from notes import NOTE_TYPES, QA_NOTE_TYPE, REVIEW_MODES
+from review_log import LAPSE_CODES, ReviewLog, new_review_stats
+from scheduler import DIFFICULTIES, GROWTH_FACTORS, calculate_next_intervals, calculate_next_review_date, calculate_next_review_dates
+
+# 합성 노트 모음 크기 (기본 실행은 작은 두 크기만, --sizes로 1M까지 지정)
+BENCH_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_SIZES = (1_000, 10_000)
+# 생성한 노트 모음 DB를 보관할 폴더 (같은 크기/시드는 다시 만들지 않음)
+BENCH_DIR = os.environ.get("REVIEW_BENCH_DIR", ".bench")
+# 이 컴퓨터에서 --save-baseline으로 만든 기준값 (절대 시간이라 컴퓨터마다 다르므로 저장소에 넣지 않음)
+BASELINE_PATH = "bench_baseline.json"
+# 기준값보다 이 비율 이상 나빠지면 회귀로 표시
+REGRESSION_THRESHOLD = 0.25
+# 페이지마다 첫 실행 뒤 반복할 재실행 횟수
+PAGE_RERUNS = 5
+# 스케줄러 처리량 측정에 쓸 호출 수
+SCHEDULER_CALLS = 200_000
+GENERATE_BATCH_SIZE = 10_000
+# 복습량 예측(365일)을 잴 노트 모음 크기와, 간격 1일이 흡수 상태가 아닌 맞춘 간격 배수 예시
+FORECAST_SIZE = 100_000
+FORECAST_FITTED_FACTORS = (2.37, 1.3, 0.6, 0.0)
+
+# 측정할 페이지 (main.py의 페이지 분기 + 검색어를 입력한 통계 페이지)
+BENCH_PAGES = ("home", "add_note", "review_list", "single_review", "review_session", "stats", "stats_search", "bulk")
+
+# 합성 데이터 분포
+CATEGORY_COUNT = 30
+TAG_COUNT = 300
+MAX_HISTORY = 40  # 노트당 최대 복습 횟수
+MEAN_HISTORY = 6  # 노트당 평균 복습 횟수 (기하분포)
+NEW_NOTE_RATIO = 0.15  # 아직 한 번도 복습하지 않은 노트 비율
+MAX_AGE_DAYS = 730  # 노트 생성일 범위 (오늘부터 최대 2년 전)
+WORDS = [
+    "사과", "바나나", "물리", "관성", "미분", "적분", "행렬", "벡터", "문법", "단어", "역사", "조선",
+    "apple", "python", "network", "database", "kernel", "theorem", "protein", "enzyme", "verb", "noun",
+]
+
+
+# --- 합성 노트 모음 생성 ---
+def _zipf_choice(rng, count, size, exponent=1.1):
+    """앞쪽 값일수록 자주 나오는(멱법칙) 0~count-1 정수를 size개 뽑습니다. (태그/카테고리 분포)"""
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return rng.choice(count, size=size, p=weights / weights.sum())
+
+
+def _simulate_reviews(rng, created, skill, today):
+    """
+    노트마다 실제 스케줄러 규칙대로 복습을 진행시켜 (복습 이력, 마지막 상태)를 만듭니다.
+    모든 노트를 한 단계씩 함께 진행하는 벡터화 시뮬레이션이며, 오늘 이후 복습은 기록하지 않으므로
+    일부는 밀린 복습, 일부는 앞으로의 복습이 되어 현실적인 예정일 분포가 생깁니다.
+    """
+    size = len(created)
+    target = np.minimum(rng.geometric(1 / MEAN_HISTORY, size), MAX_HISTORY)
+    target[rng.random(size) < NEW_NOTE_RATIO] = 0
+    interval = np.ones(size, dtype=np.int64)  # 새 노트의 첫 간격은 1일
+    next_day = created + 1
+    last_day = np.full(size, -1, dtype=np.int64)
+    done = np.zeros(size, dtype=np.int64)
+    # 노트별 난이도 분포: 잘 외운 노트일수록 '쉬웠음'이 많음
+    probs = np.stack([skill * 0.6, skill * 0.4 + (1 - skill) * 0.3, (1 - skill) * 0.4, (1 - skill) * 0.3], axis=1)
+    cumulative = np.cumsum(probs / probs.sum(axis=1, keepdims=True), axis=1)
+    events = []  # (노트 위치, 날짜 ordinal, 난이도 코드, 간격) 배열 묶음
+    for _ in range(MAX_HISTORY):
+        active = np.flatnonzero((done < target) & (next_day <= today))
+        if not len(active):
+            break
+        codes = (rng.random(len(active))[:, None] > cumulative[active]).sum(axis=1)
+        # 예정일보다 며칠 늦게 복습하는 경우도 섞음
+        review_day = np.minimum(next_day[active] + rng.poisson(0.5, len(active)), today)
+        new_interval = calculate_next_intervals(codes, interval[active])
+        events.append((active, review_day, codes, new_interval))
+        interval[active] = new_interval
+        last_day[active] = review_day
+        next_day[active] = review_day + new_interval
+        done[active] += 1
+    return events, interval, last_day, next_day
+
+
+def generate_collection(path, size, seed=0, today=None):
+    """
+    size개의 합성 노트와 복습 이력을 path의 SQLite 저장소에 만듭니다.
+    태그/카테고리는 멱법칙 분포, 복습 횟수는 기하분포, 복습 일정은 실제 스케줄러로 시뮬레이션합니다.
+    """
+    from note_store import SQLiteNoteStore
+
+    today = today or date.today()
+    rng = np.random.default_rng(seed)
+    today_ordinal = today.toordinal()
+    created = today_ordinal - rng.integers(0, MAX_AGE_DAYS, size)
+    events, interval, last_day, next_day = _simulate_reviews(rng, created, rng.beta(4, 2, size), today_ordinal)
+
+    # 노트 위치별 이벤트를 한 번에 정렬해 배치마다 잘라 쓸 수 있게 함
+    if events:
+        positions, days, codes, intervals = (np.concatenate(column) for column in zip(*events))
+        order = np.argsort(positions, kind="stable")
+        positions, days, codes, intervals = positions[order], days[order], codes[order], intervals[order]
+    else:
+        positions = days = codes = intervals = np.empty(0, dtype=np.int64)
+    counts = np.zeros((size, len(DIFFICULTIES)), dtype=np.int64)
+    np.add.at(counts, (positions, codes), 1)
+    starts = np.searchsorted(positions, np.arange(size + 1))
+
+    types = np.where(rng.random(size) < 0.6, 0, 1)
+    categories = _zipf_choice(rng, CATEGORY_COUNT, size)
+    has_category = rng.random(size) >= 0.1
+    tag_counts = rng.integers(0, 4, size)
+    tags = _zipf_choice(rng, TAG_COUNT, int(tag_counts.sum()))
+    tag_starts = np.concatenate([[0], np.cumsum(tag_counts)])
+    words = rng.integers(0, len(WORDS), (size, 4))
+
+    store = SQLiteNoteStore(path)
+    try:
+        for batch_start in range(0, size, GENERATE_BATCH_SIZE):
+            batch_end = min(size, batch_start + GENERATE_BATCH_SIZE)
+            notes, log = [], ReviewLog()
+            for i in range(batch_start, batch_end):
+                note_type = NOTE_TYPES[types[i]]
+                front = f"{WORDS[words[i, 0]]} {WORDS[words[i, 1]]} {i}"
+                back = f"{WORDS[words[i, 2]]} {WORDS[words[i, 3]]}"
+                content = {"question": front, "answer": back} if note_type == QA_NOTE_TYPE else {"front": front, "back": back}
+                note = {
+                    "id": i,
+                    "type": note_type,
+                    "title": front[:30],
+                    "tags": sorted({f"#태그{tag}" for tag in tags[tag_starts[i]:tag_starts[i + 1]]}),
+                    "category": f"카테고리{categories[i]}" if has_category[i] else "",
+                    "content": content,
+                    "created_date": date.fromordinal(int(created[i])),
+                    "last_reviewed_date": date.fromordinal(int(last_day[i])) if last_day[i] > 0 else None,
+                    "next_review_date": date.fromordinal(int(next_day[i])),
+                    "current_interval": int(interval[i]),
+                    "initial_review_mode": REVIEW_MODES[note_type],
+                    **new_review_stats(),
+                }
+                note_codes = codes[starts[i]:starts[i + 1]]
+                if len(note_codes):
+                    note["difficulty_counts"] = counts[i].tolist()
+                    note["last_difficulty"] = DIFFICULTIES[note_codes[-1]]
+                    lapses = np.flatnonzero(np.isin(note_codes, LAPSE_CODES))
+                    note["streak"] = len(note_codes) - (int(lapses[-1]) + 1 if len(lapses) else 0)
+                    note["review_count"] = len(note_codes)
+                    note["lapse_count"] = len(lapses)
+                notes.append(note)
+            start, end = starts[batch_start], starts[batch_end]
+            log.note_ids.extend(positions[start:end].tolist())
+            log.days.extend(days[start:end].tolist())
+            log.difficulties.extend(codes[start:end].tolist())
+            log.intervals.extend(intervals[start:end].tolist())
+            store.upsert_many(notes, log)
+    finally:
+        store.close()
+
+
+def collection_path(size, seed=0):
+    """크기/시드별 합성 노트 모음 DB 경로. 없으면 새로 만듭니다."""
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    path = os.path.join(BENCH_DIR, f"notes_{size}_{seed}.db")
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        generate_collection(path + ".tmp", size, seed)
+        os.replace(path + ".tmp", path)
+        print(f"  {size}개 노트 모음 생성: {time.perf_counter() - started:.1f}초", file=sys.stderr)
+    return path
+
+
+# --- 측정 ---
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def _open_page(at, page):
+    """AppTest 세션에서 page로 이동해 한 번 실행합니다. (검색/연속 복습 시나리오는 필요한 입력까지)"""
+    if page == "stats_search":
+        at.session_state.page = "stats"
+        at.run()
+        at.text_input(key="stats_search_bar").input(WORDS[0])
+    elif page == "single_review":
+        due_ids = at.session_state.repository.due_snapshot.due_ids()
+        at.session_state.page = "single_review"
+        at.session_state.selected_note_for_review_id = due_ids[0] if due_ids else 0
+    elif page == "review_session":
+        at.session_state.page = "review_list"
+        at.run()
+        at.button(key="start_review_session").click()
+    else:
+        at.session_state.page = page
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{page} 페이지 실행 중 오류: {at.exception[0].message}")
+
+
+def _new_session(app_path, timeout):
+    """
+    캐시를 모두 비운 새 AppTest 세션. 공유 저장소(st.cache_resource)는 같은 프로세스의 세션끼리 공유되므로,
+    비우지 않으면 두 번째 측정은 이미 만들어진 색인을 재사용해 시작 비용과 메모리가 실제보다 작게 나옵니다.
+    """
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    return AppTest.from_file(app_path, default_timeout=timeout)
+
+
+def bench_pages(reruns=PAGE_RERUNS, timeout=600):
+    """
+    AppTest로 main.py의 각 페이지를 헤드리스로 실행해 첫 실행과 반복 재실행 시간을 잽니다.
+    메모리는 tracemalloc 부하가 시간에 섞이지 않도록 별도의 세션에서 페이지별 최대 할당량으로 측정합니다.
+    두 측정 모두 캐시를 비운 상태에서 시작합니다.
+    """
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    results = {}
+
+    at = _new_session(app_path, timeout)
+    started = time.perf_counter()
+    at.run()  # 세션 시작 (저장소 연결, 오늘의 복습 스냅샷 구성)
+    results["startup"] = {"first_ms": _ms(time.perf_counter() - started)}
+    for page in BENCH_PAGES:
+        started = time.perf_counter()
+        _open_page(at, page)
+        first = time.perf_counter() - started
+        samples = []
+        for _ in range(reruns):
+            started = time.perf_counter()
+            at.run()
+            samples.append(time.perf_counter() - started)
+        results[page] = {
+            "first_ms": _ms(first),
+            "rerun_p50_ms": _ms(np.percentile(samples, 50)),
+            "rerun_p90_ms": _ms(np.percentile(samples, 90)),
+        }
+
+    at = _new_session(app_path, timeout)
+    tracemalloc.start()
+    try:
+        at.run()
+        results["startup"]["peak_alloc_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        for page in BENCH_PAGES:
+            tracemalloc.reset_peak()
+            _open_page(at, page)
+            results[page]["peak_alloc_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def bench_scheduler(calls=SCHEDULER_CALLS, seed=0):
+    """calculate_next_review_date(스칼라)와 calculate_next_review_dates(배열)의 초당 처리량"""
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, len(DIFFICULTIES), calls)
+    intervals = rng.integers(0, 400, calls)
+    difficulties = [DIFFICULTIES[code] for code in codes]
+    last_intervals = intervals.tolist()
+    today = date.today()
+
+    started = time.perf_counter()
+    for difficulty, last_interval in zip(difficulties, last_intervals):
+        calculate_next_review_date(today, difficulty, last_interval)
+    scalar = time.perf_counter() - started
+
+    dates = np.full(calls, np.datetime64(today, "D"))
+    started = time.perf_counter()
+    calculate_next_review_dates(dates, codes, intervals)
+    batch = time.perf_counter() - started
+    return {"scalar_calls_per_s": round(calls / scalar), "batch_items_per_s": round(calls / batch)}
+
+
+def bench_forecast(size=FORECAST_SIZE, seed=0, horizon=365):
+    """size개 노트 모음의 horizon일 복습량 예측(forecast_review_load) 시간을 기본/맞춘 간격 배수별로 잽니다."""
+    from forecast import collect_forecast_inputs, forecast_review_load
+    from note_store import SQLiteNoteStore
+
+    store = SQLiteNoteStore(collection_path(size, seed))
+    try:
+        inputs = collect_forecast_inputs(store, date.today())
+    finally:
+        store.close()
+    results = {"size": size}
+    for name, growth_factors in (("default", GROWTH_FACTORS), ("fitted", FORECAST_FITTED_FACTORS)):
+        started = time.perf_counter()
+        forecast_review_load(*inputs, horizon=horizon, growth_factors=growth_factors)
+        results[f"{name}_ms"] = _ms(time.perf_counter() - started)
+    return results
+
+
+def run_size(size, seed=0, reruns=PAGE_RERUNS):
+    """한 크기의 노트 모음으로 페이지를 측정합니다. 저장소 경로가 모듈 로드 시 정해지므로 크기마다 새 프로세스에서 실행합니다."""
+    # note_store를 처음 불러오기 전에 경로를 정해야 함 (DEFAULT_DB_PATH는 모듈 로드 시 결정)
+    os.environ["REVIEW_DB_PATH"] = os.path.join(BENCH_DIR, f"notes_{size}_{seed}.db")
+    path = collection_path(size, seed)
+    pages = bench_pages(reruns)
+    results = {"pages": pages, "db_mb": round(os.path.getsize(path) / 2**20, 2)}
+    if resource is not None:
+        # ru_maxrss 단위는 리눅스에서 KB, macOS에서 바이트
+        scale = 2**20 if sys.platform == "darwin" else 2**10
+        results["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+    return results
+
+
+# --- 기준값 비교 ---
+def flatten(results, prefix=""):
+    """중첩된 결과를 'size/pages/stats/first_ms' 같은 키의 평평한 딕셔너리로 바꿉니다."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "/"))
+        else:
+            flat[name] = value
+    return flat
+
+
+def find_regressions(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    기준값보다 threshold 비율 이상 나빠진 지표를 (키, 기준값, 현재값, 변화율) 목록으로 반환합니다.
+    _ms/_mb 지표는 커지면, _per_s 지표는 작아지면 회귀입니다.
+    """
+    current, base = flatten(results), flatten(baseline)
+    regressions = []
+    for key, value in current.items():
+        reference = base.get(key)
+        if not reference:
+            continue
+        change = value / reference - 1
+        if key.endswith("_per_s"):
+            change = reference / value - 1 if value else float("inf")
+        if change > threshold:
+            regressions.append((key, reference, value, change))
+    return regressions
+
+
+def format_report(results, regressions):
+    lines = []
+    for size, size_results in results.get("sizes", {}).items():
+        lines.append(f"== 노트 {int(size):,}개 (DB {size_results['db_mb']} MB, 최대 RSS {size_results.get('peak_rss_mb', '?')} MB)")
+        lines.append(f"{'페이지':<16}{'첫 실행(ms)':>14}{'재실행 p50':>14}{'재실행 p90':>14}{'최대 할당(MB)':>16}")
+        for page, metrics in size_results["pages"].items():
+            lines.append(
+                f"{page:<16}{metrics['first_ms']:>14.1f}{metrics.get('rerun_p50_ms', float('nan')):>14.1f}"
+                f"{metrics.get('rerun_p90_ms', float('nan')):>14.1f}{metrics.get('peak_alloc_mb', float('nan')):>16.1f}"
+            )
+    scheduler = results.get("scheduler")
+    if scheduler:
+        lines.append(
+            f"== 스케줄러: 스칼라 {scheduler['scalar_calls_per_s']:,}회/초, 배열 {scheduler['batch_items_per_s']:,}개/초"
+        )
+    forecast = results.get("forecast")
+    if forecast:
+        lines.append(
+            f"== 복습량 예측(노트 {forecast['size']:,}개, 365일): "
+            f"기본 배수 {forecast['default_ms']:.1f} ms, 맞춘 배수 {forecast['fitted_ms']:.1f} ms"
+        )
+    if regressions:
+        lines.append(f"== 회귀 {len(regressions)}개")
+        for key, reference, value, change in regressions:
+            lines.append(f"  {key}: {reference} -> {value} ({change:+.0%})")
+    return "\n".join(lines)
+
+
+# --- 명령줄 실행 ---
+def main():
+    parser = argparse.ArgumentParser(description="합성 노트 모음으로 페이지 재실행 시간, 메모리, 스케줄러 처리량을 측정합니다.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help=f"노트 수 (예: {' '.join(map(str, BENCH_SIZES))})")
+    parser.add_argument("--reruns", type=int, default=PAGE_RERUNS)
+    parser.add_argument("--forecast-size", type=int, default=FORECAST_SIZE, help="복습량 예측을 잴 노트 수 (0이면 건너뜀)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--output", help="보고서를 저장할 파일")
+    parser.add_argument("--json", help="결과 JSON을 저장할 파일")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)  # 내부용: 한 크기만 측정하고 JSON 출력
+    args = parser.parse_args()
+
+    if args.run_size:
+        print(json.dumps(run_size(args.run_size, args.seed, args.reruns)))
+        return 0
+
+    results = {"sizes": {}, "scheduler": bench_scheduler(seed=args.seed)}
+    if args.forecast_size:
+        print(f"노트 {args.forecast_size:,}개 복습량 예측 측정 중...", file=sys.stderr)
+        results["forecast"] = bench_forecast(args.forecast_size, args.seed)
+    for size in args.sizes:
+        print(f"노트 {size:,}개 측정 중...", file=sys.stderr)
+        # 크기마다 새 프로세스: 최대 RSS와 모듈 수준 캐시가 다른 크기와 섞이지 않음
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-size", str(size), "--seed", str(args.seed), "--reruns", str(args.reruns)],
+            stdout=subprocess.PIPE, check=True, text=True,
+        )
+        results["sizes"][str(size)] = json.loads(child.stdout.strip().splitlines()[-1])
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = find_regressions(results, json.load(f), args.threshold)
+    elif not args.save_baseline:
+        print(f"기준값 파일({args.baseline})이 없어 회귀를 비교하지 않습니다. --save-baseline으로 이 컴퓨터의 기준값을 만드세요.", file=sys.stderr)
+    report = format_report(results, regressions)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"기준값을 {args.baseline}에 저장했습니다.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
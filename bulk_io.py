@@ -0,0 +1,353 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import re
+from collections import namedtuple
+from datetime import datetime
+
+from grading import grade_batch
+from notes import FLASHCARD_NOTE_TYPE, NOTE_TYPES, QA_NOTE_TYPE, build_note, is_content_empty
+
+# 지원 형식 (확장자 -> 표시 이름)
+IMPORT_FORMATS = {"csv": "CSV", "jsonl": "JSONL", "tsv": "Anki TSV (앞면, 뒷면, 태그)"}
+EXPORT_FORMATS = IMPORT_FORMATS
+# 답안지 형식 (각 줄에 노트 id와 answer)
+ANSWER_SHEET_FORMATS = {"csv": "CSV", "jsonl": "JSONL"}
+
+# 한 번에 저장할 노트 수
+IMPORT_BATCH_SIZE = 1000
+# 결과에 보관할 오류 줄 수 (전체 개수는 따로 셈)
+MAX_REPORTED_ERRORS = 100
+
+CSV_FIELDS = [
+    "id", "type", "title", "tags", "category", "question", "answer", "front", "back",
+    "created_date", "last_reviewed_date", "next_review_date", "current_interval", "review_history",
+]
+
+# Anki 내보내기 파일 맨 앞의 헤더 줄 (#키:값, Anki가 쓰는 키만)
+ANKI_HEADER = re.compile(
+    r"#(separator|html|tags column|columns|notetype|deck|notetype column|deck column|guid column|if matches):"
+)
+
+ImportResult = namedtuple("ImportResult", ["imported", "error_count", "errors"])
+# graded: (줄 번호, 노트 ID, 답안, GradeResult 또는 노트가 없으면 None) 목록
+AnswerSheetResult = namedtuple("AnswerSheetResult", ["graded", "error_count", "errors"])
+
+
+# --- 파일 읽기 (형식별로 한 줄씩 레코드를 만듦) ---
+def _read_csv(text):
+    for row in csv.DictReader(text):
+        yield row
+
+
+def _read_jsonl(text):
+    for line in text:
+        if not line.strip():
+            yield None  # 빈 줄도 한 줄로 셈
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"_error": f"JSON 형식 오류: {e.msg}"}
+
+
+def _read_anki_tsv(text):
+    """
+    Anki '일반 텍스트로 내보내기' 형식: 앞면<TAB>뒷면[<TAB>공백으로 구분된 태그]
+    파일 맨 앞의 '#키:값' 줄만 헤더로 건너뛰고, 그 뒤의 '#'으로 시작하는 줄(#include 등)은 노트로 읽습니다.
+    """
+    lines = iter(text)
+    for line in lines:
+        if not ANKI_HEADER.match(line):
+            break
+        yield None  # 줄 번호를 맞추기 위해 헤더와 빈 줄도 한 줄로 셈
+    else:
+        return
+    for row in csv.reader(itertools.chain([line], lines), delimiter="\t"):
+        if not row:
+            yield None
+            continue
+        yield {
+            "type": FLASHCARD_NOTE_TYPE,
+            "front": row[0],
+            "back": row[1] if len(row) > 1 else "",
+            "tags": row[2].split() if len(row) > 2 else [],
+        }
+
+
+_READERS = {"csv": _read_csv, "jsonl": _read_jsonl, "tsv": _read_anki_tsv}
+
+
+def _text(record, field):
+    """레코드의 텍스트 필드를 문자열로 읽습니다. 숫자는 문자열로 바꾸고, 목록/객체 등은 ValueError"""
+    value = record.get(field)
+    if value is None:
+        return ""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"{field} 값은 문자열이어야 합니다.")
+    return str(value)
+
+
+def _tags(record):
+    """태그는 쉼표로 구분된 문자열 또는 문자열 목록"""
+    tags = record.get("tags")
+    if isinstance(tags, list):
+        return [_text({"tags": tag}, "tags") for tag in tags]
+    return _text(record, "tags")
+
+
+def _note_type(record, content):
+    note_type = _text(record, "type")
+    if note_type in NOTE_TYPES:
+        return note_type
+    if note_type.lower() in ("qa", "q&a"):
+        return QA_NOTE_TYPE
+    if note_type.lower() == "flashcard":
+        return FLASHCARD_NOTE_TYPE
+    # 유형이 없으면 앞면/뒷면 필드가 있는지로 판단
+    return FLASHCARD_NOTE_TYPE if content.get("front") or content.get("back") else QA_NOTE_TYPE
+
+
+def record_to_note(record, note_id, today):
+    """가져온 레코드 하나를 새 노트 폼과 같은 규칙으로 검증하여 노트로 만듭니다. 잘못된 레코드는 ValueError."""
+    if not isinstance(record, dict):
+        raise ValueError("레코드 형식이 올바르지 않습니다.")
+    if "_error" in record:
+        raise ValueError(record["_error"])
+    # JSONL 내보내기 파일처럼 content가 따로 있으면 그 안의 값을 사용
+    source = record.get("content") if isinstance(record.get("content"), dict) else record
+    content = {key: _text(source, key) for key in ("question", "answer", "front", "back")}
+    note_type = _note_type(record, content)
+    if note_type == QA_NOTE_TYPE:
+        content = {"question": content["question"], "answer": content["answer"]}
+    else:
+        content = {"front": content["front"], "back": content["back"]}
+    if is_content_empty(note_type, content):
+        raise ValueError("질문/앞면과 답변/뒷면 내용을 모두 입력해야 합니다.")
+    return build_note(
+        note_id, note_type, _text(record, "title"), _tags(record), _text(record, "category"), content, today
+    )
+
+
+def _file_size(binary_file):
+    size = getattr(binary_file, "size", None)
+    if size is None:
+        position = binary_file.tell()
+        size = binary_file.seek(0, io.SEEK_END)
+        binary_file.seek(position)
+    return size or 1
+
+
+# --- 일괄 가져오기 ---
+def import_notes(binary_file, fmt, today, save_batch, allocate_ids, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """
+    파일을 한 줄씩 읽어 검증한 뒤 batch_size개씩 save_batch(notes)로 저장합니다.
+    노트 ID는 저장 직전에 allocate_ids(개수)로 배치마다 한 번에 발급받습니다.
+    전체 파일을 노트 목록으로 한 번에 만들지 않으므로 메모리 사용량은 배치 크기에 비례합니다.
+    progress(가져온 노트 수, 진행률 0~1)가 주어지면 배치마다 호출합니다.
+    """
+    total_bytes = _file_size(binary_file)
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    batch, imported, errors, error_count = [], 0, [], 0
+
+    def save(notes):
+        for note, note_id in zip(notes, allocate_ids(len(notes))):
+            note["id"] = note_id
+        save_batch(notes)
+
+    try:
+        # CSV 헤더는 1번째 줄이므로 데이터는 2번째 줄부터
+        start_line = 2 if fmt == "csv" else 1
+        for line_no, record in enumerate(_READERS[fmt](text), start=start_line):
+            if record is None:
+                continue
+            try:
+                note = record_to_note(record, None, today)
+            except (ValueError, TypeError, AttributeError) as e:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append((line_no, str(e)))
+                continue
+            batch.append(note)
+            if len(batch) >= batch_size:
+                save(batch)
+                imported += len(batch)
+                batch = []
+                if progress:
+                    progress(imported, min(1.0, binary_file.tell() / total_bytes))
+        if batch:
+            save(batch)
+            imported += len(batch)
+        if progress:
+            progress(imported, 1.0)
+    finally:
+        text.detach()  # 업로드 파일 자체는 닫지 않음
+    return ImportResult(imported, error_count, errors)
+
+
+# --- 답안지 일괄 채점 ---
+def read_answer_sheet(binary_file, fmt):
+    """
+    답안지에서 (줄 번호, 노트 ID, 답안)을 읽습니다. 각 줄에는 `id`와 `answer`(또는 `response`)가 있어야 합니다.
+    반환값: (답안 목록, 오류 수, 오류 (줄 번호, 메시지) 목록)
+    """
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    rows, errors, error_count = [], [], 0
+    try:
+        start_line = 2 if fmt == "csv" else 1
+        for line_no, record in enumerate(_READERS[fmt](text), start=start_line):
+            if record is None:
+                continue
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("레코드 형식이 올바르지 않습니다.")
+                if "_error" in record:
+                    raise ValueError(record["_error"])
+                try:
+                    note_id = int(record["id"])
+                except (KeyError, ValueError, TypeError):
+                    raise ValueError("id 값이 올바르지 않습니다.") from None
+                response = record.get("answer", record.get("response"))
+                if response is None:
+                    raise ValueError("answer 값이 없습니다.")
+                rows.append((line_no, note_id, str(response)))
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append((line_no, str(e)))
+    finally:
+        text.detach()
+    return rows, error_count, errors
+
+
+def grade_answer_sheet(binary_file, fmt, get_notes):
+    """
+    답안지를 읽어 한 번에 채점합니다. 노트는 get_notes(ID 목록)로 한 번에 가져오고,
+    정답 키는 노트를 저장할 때 만들어 둔 값을 그대로 씁니다.
+    """
+    rows, error_count, errors = read_answer_sheet(binary_file, fmt)
+    notes = {note["id"]: note for note in get_notes(dict.fromkeys(note_id for _, note_id, _ in rows))}
+    results = grade_batch(((note_id, response) for _, note_id, response in rows), notes)
+    graded = [(line_no, note_id, response, result) for (line_no, note_id, response), result in zip(rows, results)]
+    return AnswerSheetResult(graded, error_count, errors)
+
+
+# --- 일괄 내보내기 ---
+def iter_notes_with_history(store):
+    """노트(ID 순)와 복습 이벤트(노트 ID 순)를 병합하여, review_history가 채워진 노트를 하나씩 반환합니다."""
+    events = store.iter_review_events()
+    pending = next(events, None)
+    for note in store.iter_notes():
+        history = []
+        while pending is not None and pending["note_id"] <= note["id"]:
+            if pending["note_id"] == note["id"]:
+                history.append({key: pending[key] for key in ("date", "difficulty", "interval_used")})
+            pending = next(events, None)
+        note["review_history"] = history
+        yield note
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _export_record(note):
+    return {
+        "id": note["id"],
+        "type": note["type"],
+        "title": note["title"],
+        "tags": note["tags"],
+        "category": note["category"],
+        "content": note["content"],
+        "created_date": _iso(note["created_date"]),
+        "last_reviewed_date": _iso(note["last_reviewed_date"]),
+        "next_review_date": _iso(note["next_review_date"]),
+        "current_interval": note["current_interval"],
+        "initial_review_mode": note["initial_review_mode"],
+        "review_history": [
+            {**event, "date": _iso(event["date"])} for event in note["review_history"]
+        ],
+    }
+
+
+def export_notes(store, out, fmt):
+    """노트와 복습 이력을 텍스트 스트림 out에 한 노트씩 씁니다. 반환값: 내보낸 노트 수"""
+    count = 0
+    if fmt == "jsonl":
+        for note in iter_notes_with_history(store):
+            out.write(json.dumps(_export_record(note), ensure_ascii=False) + "\n")
+            count += 1
+    elif fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for note in iter_notes_with_history(store):
+            record = _export_record(note)
+            content = record.pop("content")
+            record.pop("initial_review_mode")
+            record.update({key: content.get(key, "") for key in ("question", "answer", "front", "back")})
+            record["tags"] = ", ".join(record["tags"])
+            record["review_history"] = json.dumps(record["review_history"], ensure_ascii=False)
+            writer.writerow(record)
+            count += 1
+    else:
+        # Anki 형식은 앞면/뒷면/태그만 지원 (복습 이력 없음)
+        out.write("#separator:tab\n#html:false\n#tags column:3\n")
+        writer = csv.writer(out, delimiter="\t", lineterminator="\n")
+        for note in store.iter_notes():
+            content = note["content"]
+            writer.writerow([
+                content.get("front") or content.get("question") or "",
+                content.get("back") or content.get("answer") or "",
+                " ".join(tag.replace(" ", "_") for tag in note["tags"]),
+            ])
+            count += 1
+    return count
+
+
+def export_notes_bytes(store, fmt):
+    """
+    내보내기 파일을 메모리 버퍼에 바로 써서 다운로드용 바이트로 반환합니다.
+    다운로드 파일 전체가 메모리에 올라가므로, 아주 큰 모음은 명령줄 export로 파일에 바로 쓰세요.
+    """
+    buffer = io.BytesIO()
+    text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    export_notes(store, text, fmt)
+    text.flush()
+    text.detach()
+    return buffer.getvalue()
+
+
+def guess_format(file_name):
+    extension = os.path.splitext(file_name)[1].lower().lstrip(".")
+    return {"txt": "tsv"}.get(extension, extension) if extension in (*IMPORT_FORMATS, "txt") else "csv"
+
+
+# --- 명령줄 실행 (대용량 파일을 Streamlit 업로드 없이 바로 처리) ---
+if __name__ == "__main__":
+    from note_store import DEFAULT_DB_PATH, DEFAULT_USER, SQLiteNoteStore
+
+    parser = argparse.ArgumentParser(description="노트 일괄 가져오기/내보내기")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=list(IMPORT_FORMATS))
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--user", default=DEFAULT_USER, help="노트를 가져오거나 내보낼 사용자")
+    args = parser.parse_args()
+
+    store = SQLiteNoteStore(args.db, args.user)
+    fmt = args.format or guess_format(args.path)
+    if args.command == "import":
+        with open(args.path, "rb") as f:
+            result = import_notes(
+                f, fmt, datetime.now().date(), store.upsert_many, store.allocate_ids,
+                progress=lambda done, ratio: print(f"\r{done}개 가져옴 ({ratio:.0%})", end="", flush=True),
+            )
+        print(f"\n완료: {result.imported}개 가져옴, 오류 {result.error_count}줄")
+        for line_no, message in result.errors:
+            print(f"  {line_no}번째 줄: {message}")
+    else:
+        with open(args.path, "w", encoding="utf-8", newline="") as f:
+            print(f"완료: {export_notes(store, f, fmt)}개 내보냄")
@@ -0,0 +1,120 @@
+import threading
+import weakref
+from bisect import bisect_left
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+
+def _seconds_until_midnight(now):
+    """다음 자정(현지 시각)까지 남은 초. 타이머 오차로 자정 직전에 깨어나지 않도록 1초 여유를 둠"""
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+    return (midnight - now).total_seconds() + 1
+
+
+def _schedule_midnight_refresh(snapshot_ref):
+    snapshot = snapshot_ref()
+    if snapshot is None:  # 세션이 끝나 스냅샷이 사라졌으면 더 예약하지 않음
+        return
+    timer = threading.Timer(_seconds_until_midnight(datetime.now()), _midnight_refresh, args=(snapshot_ref,))
+    timer.daemon = True
+    snapshot._timer = timer
+    timer.start()
+
+
+def _midnight_refresh(snapshot_ref):
+    snapshot = snapshot_ref()
+    if snapshot is None:
+        return
+    snapshot.ensure_day(date.today())
+    del snapshot  # 타이머가 스냅샷을 붙잡고 있지 않도록 약한 참조만 넘김
+    _schedule_midnight_refresh(snapshot_ref)
+
+
+# --- 하루 단위 복습 대상 스냅샷 ---
+class DueSnapshot:
+    """
+    오늘 복습할 노트(next_review_date <= 오늘)와 카테고리별 개수를 하루에 한 번 만들어 두는 스냅샷.
+    그날 처음 조회할 때(또는 자정 타이머가) 저장소에서 한 번 읽고, 이후에는 노트를 평가/추가/삭제할 때마다
+    해당 노트만 반영하므로 사이드바와 각 페이지가 매 재실행마다 복습 목록을 다시 계산하지 않습니다.
+    오래된 순서 목록도 (예정일, ID) 정렬 위치에 이분 탐색으로 넣고 빼서, 평가할 때마다 다시 정렬하지 않습니다.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.RLock()  # 자정 타이머 스레드와 스크립트 스레드가 함께 사용
+        self.day = None  # 스냅샷 기준 날짜
+        self._entries = {}  # note_id -> (next_review_date, category)
+        self._category_counts = Counter()
+        self._keys = []  # (next_review_date, note_id) 정렬 목록
+        self._ordered = []  # _keys와 같은 순서의 ID 목록 (due_ids 반환값)
+        self._timer = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, note_id):
+        return note_id in self._entries
+
+    def ensure_day(self, today):
+        """스냅샷이 today 기준이 아니면 다시 만듭니다. (하루에 한 번)"""
+        with self._lock:
+            if self.day != today:
+                self._entries = {
+                    note_id: (next_review_date, category)
+                    for note_id, category, next_review_date in self._store.due_entries(today)
+                }
+                self._category_counts = Counter(category for _, category in self._entries.values())
+                self._keys = sorted((next_review_date, note_id) for note_id, (next_review_date, _) in self._entries.items())
+                self._ordered = [note_id for _, note_id in self._keys]
+                self.day = today
+            return self.day
+
+    def start_midnight_refresh(self):
+        """자정마다 백그라운드 스레드에서 다음 날 스냅샷을 미리 만듭니다."""
+        if self._timer is None:
+            _schedule_midnight_refresh(weakref.ref(self))
+
+    def _discard(self, note_id):
+        entry = self._entries.pop(note_id, None)
+        if entry is not None:
+            self._category_counts[entry[1]] -= 1
+            if not self._category_counts[entry[1]]:
+                del self._category_counts[entry[1]]
+            position = bisect_left(self._keys, (entry[0], note_id))
+            del self._keys[position]
+            del self._ordered[position]
+        return entry
+
+    def update(self, note):
+        """평가/추가/수정된 노트를 반영합니다. 예정일이 오늘 이후로 밀리면 목록에서 빠집니다."""
+        with self._lock:
+            if self.day is None:
+                return
+            self._discard(note['id'])
+            next_review_date = note['next_review_date']
+            if next_review_date is not None and next_review_date <= self.day:
+                self._entries[note['id']] = (next_review_date, note['category'])
+                self._category_counts[note['category']] += 1
+                key = (next_review_date, note['id'])
+                position = bisect_left(self._keys, key)
+                self._keys.insert(position, key)
+                self._ordered.insert(position, note['id'])
+
+    def remove(self, note_id):
+        with self._lock:
+            self._discard(note_id)
+
+    def due_ids(self):
+        """오늘 복습할 노트 ID를 오래된 순서로 반환합니다. (내부 목록이므로 고치지 말 것)"""
+        with self._lock:
+            return self._ordered
+
+    def count(self, category=None):
+        if category is None:
+            return len(self._entries)
+        return self._category_counts.get(category, 0)
+
+    def category_counts(self):
+        """카테고리별 오늘 복습할 노트 수 (많은 순, 카테고리가 없는 노트는 '' 키)"""
+        with self._lock:
+            return dict(self._category_counts.most_common())
@@ -0,0 +1,197 @@
+import os
+
+import numpy as np
+
+from parallel import CHUNK_ELEMENTS, run_jobs, workers_from_env
+from scheduler import DIFFICULTIES, GROWTH_FACTORS, calculate_next_intervals
+
+# 예측 기간(일)
+FORECAST_HORIZONS = (30, 90, 365)
+
+# 예측 계산에 사용할 프로세스 수 (미설정이면 CPU 수, 1이면 현재 프로세스에서 실행)
+FORECAST_WORKERS = workers_from_env("FORECAST_WORKERS") or os.cpu_count()
+
+# 노트별 난이도 분포를 묶을 격자 (1/PROFILE_STEPS 단위로 반올림해 같은 칸의 노트는 칸 평균 분포로 계산)
+PROFILE_STEPS = 20
+# 상위/하위 10% 복습량에 쓰는 표준정규분포 분위수
+Z_90 = 1.2815515655446004
+
+
+# --- 예측 입력 준비 ---
+def collect_forecast_inputs(store, today):
+    """
+    저장소에서 노트별 예측 입력을 배열로 모읍니다.
+    반환값: (오늘 기준 복습 예정일 오프셋, 현재 간격, 난이도별 평가 횟수 (n, 4))
+    """
+    offsets, intervals, counts = [], [], []
+    for next_review_date, current_interval, difficulty_counts in store.iter_schedule_state():
+        if next_review_date is None:
+            continue
+        offsets.append((next_review_date - today).days)
+        intervals.append(current_interval)
+        counts.append(difficulty_counts)
+    return (
+        np.asarray(offsets, dtype=np.int64),
+        np.asarray(intervals, dtype=np.int64),
+        np.asarray(counts, dtype=np.float64).reshape(-1, len(DIFFICULTIES)),
+    )
+
+
+def difficulty_probabilities(counts, prior_weight=2.0):
+    """
+    노트별 난이도 평가 이력으로 다음 평가 난이도의 확률 분포를 만듭니다.
+    이력이 적은 노트는 전체 노트의 분포(사전 분포) 쪽으로 당겨집니다.
+    """
+    global_p = (counts.sum(axis=0) + 1.0) / (counts.sum() + len(DIFFICULTIES))
+    return (counts + prior_weight * global_p) / (counts.sum(axis=1, keepdims=True) + prior_weight)
+
+
+# --- 복습 확률 전파 ---
+def _reachable_intervals(intervals, horizon, growth_factors):
+    """
+    현재 간격들에서 간격 규칙을 거듭 적용해 닿을 수 있는 간격 중 예측 기간보다 짧은 것 (정렬된 배열)
+    기간 이상인 간격은 다음 복습이 기간 밖이므로 더 따라가지 않습니다.
+    """
+    codes = np.arange(len(DIFFICULTIES))
+    reachable = np.empty(0, dtype=np.int64)
+    frontier = np.unique(intervals)
+    while frontier.size:
+        following = calculate_next_intervals(codes, frontier[:, None], growth_factors)
+        frontier = np.setdiff1d(following[following < horizon], reachable)
+        reachable = np.union1d(reachable, frontier)
+    return reachable
+
+
+def review_kernels(profiles, reachable, horizon, growth_factors=GROWTH_FACTORS):
+    """
+    kernels[t, j, p]: 난이도 분포가 profiles[p]인 노트를 0일에 (직전 간격 reachable[j]로) 복습했을 때
+    t일에 다시 복습할 확률. 앞쪽 날짜의 값으로 한 날짜씩 채웁니다.
+    간격 j로 들어온 상태는 그 간격만큼 지난 뒤에야 쓰이므로 t + reachable[j] < horizon인 값만 채웁니다.
+    마지막 날짜 칸(kernels[horizon])은 기간 밖을 가리키는 0으로 남겨 둡니다.
+    반환값: (horizon + 1, 간격 수, 분포 수) float32 배열
+    """
+    codes = np.arange(len(DIFFICULTIES))
+    following = calculate_next_intervals(codes, reachable[:, None], growth_factors)
+    inside = following < horizon
+    index = np.where(inside, np.searchsorted(reachable, following), 0)
+
+    kernels = np.zeros((horizon + 1, len(reachable), len(profiles)), dtype=np.float32)
+    kernels[0] = 1.0
+    weights = profiles.T.astype(np.float32)
+    for t in range(1, horizon):
+        used = np.searchsorted(reachable, horizon - t)
+        back = t - following[:used]
+        back = np.where(inside[:used] & (back >= 0), back, horizon)
+        total = kernels[back[:, 0], index[:used, 0]] * weights[0]
+        for code in codes[1:]:
+            total += kernels[back[:, code], index[:used, code]] * weights[code]
+        kernels[t, :used] = total
+    return kernels
+
+
+def _profile_groups(probs):
+    """
+    노트별 난이도 분포를 1/PROFILE_STEPS 격자로 반올림해 같은 칸끼리 묶습니다.
+    반환값: (칸별 평균 분포 (q, 4), 노트별 칸 번호)
+    """
+    cells, group = np.unique(np.rint(probs * PROFILE_STEPS).astype(np.int64), axis=0, return_inverse=True)
+    group = group.ravel()
+    sizes = np.bincount(group, minlength=len(cells))
+    profiles = np.stack([np.bincount(group, weights=column, minlength=len(cells)) for column in probs.T], axis=1)
+    return profiles / sizes[:, None], group
+
+
+def _group_rows(kernels, profiles, reachable, group_profile, group_interval, horizon, growth_factors):
+    """
+    rows[g, t]: (분포, 현재 간격) 묶음 g의 노트를 0일에 복습한 뒤 t일에 다시 복습할 확률
+    첫 평가 결과마다 다음 간격의 확률표를 이어 붙입니다.
+    """
+    codes = np.arange(len(DIFFICULTIES))
+    days = np.arange(horizon)
+    first = calculate_next_intervals(codes, group_interval[:, None], growth_factors)
+    rows = np.zeros((len(group_profile), horizon))
+    rows[:, 0] = 1.0
+    for code in codes:
+        after = days - first[:, code, None]
+        if not (after >= 0).any():  # 이 평가면 다음 복습이 모두 기간 밖
+            continue
+        index = np.minimum(np.searchsorted(reachable, first[:, code]), len(reachable) - 1)[:, None]
+        values = kernels[np.where(after >= 0, after, horizon), index, group_profile[:, None]]
+        rows += profiles[group_profile, code, None] * values
+    return rows
+
+
+def _chunk_moments(args):
+    """분포 묶음 하나에 속한 노트들의 일별 복습 확률 합과 제곱 합 (프로세스 풀 작업 단위)"""
+    profiles, reachable, group_profile, group_interval, note_group, note_start, horizon, growth_factors = args
+    kernels = review_kernels(profiles, reachable, horizon, growth_factors)
+    days = np.arange(horizon)
+    shifted = (days[:, None] + days[None, :]).ravel()  # 시작일 + 경과일
+    total, square = np.zeros(horizon), np.zeros(horizon)
+    batch = max(1, CHUNK_ELEMENTS // horizon)  # (묶음 수 x 기간) 원소 수 제한
+    for lo in range(0, len(group_profile), batch):
+        hi = min(lo + batch, len(group_profile))
+        rows = _group_rows(kernels, profiles, reachable, group_profile[lo:hi], group_interval[lo:hi], horizon, growth_factors)
+        start, end = np.searchsorted(note_group, [lo, hi])
+        starts = np.zeros((hi - lo, horizon))  # 묶음별 시작일 노트 수
+        np.add.at(starts, (note_group[start:end] - lo, note_start[start:end]), 1)
+        # 시작일 s에 시작한 노트는 s + t일에 rows[:, t] 확률로 복습
+        total += np.bincount(shifted, weights=(starts.T @ rows).ravel(), minlength=2 * horizon)[:horizon]
+        square += np.bincount(shifted, weights=(starts.T @ rows ** 2).ravel(), minlength=2 * horizon)[:horizon]
+    return total, square
+
+
+def review_load_moments(offsets, intervals, probs, horizon, growth_factors=GROWTH_FACTORS, workers=FORECAST_WORKERS):
+    """
+    calculate_next_review_date 규칙(간격 배수는 growth_factors)으로 날짜별 복습 횟수의 평균과 분산을 계산합니다.
+    밀린 노트(오프셋 < 0)는 오늘 복습하는 것으로 봅니다.
+
+    노트가 t일에 복습할 확률은 (난이도 분포, 현재 간격)이 같으면 같고 시작일만큼 밀릴 뿐이므로,
+    묶음마다 한 번 계산해 시작일별 노트 수로 더합니다. 노트끼리는 독립이라 하루 복습 횟수의 분산은
+    노트별 p(1 - p)의 합입니다. 난이도 분포는 PROFILE_STEPS 격자 칸 단위로 묶고,
+    칸 묶음마다 메모리 상한에 맞춰 나눈 작업을 workers가 주어지면 프로세스 풀에서 병렬로 실행합니다.
+    반환값: (평균, 분산) 일별 배열
+    """
+    start = np.maximum(offsets, 0)
+    inside = start < horizon
+    start, intervals, probs = start[inside], intervals[inside], probs[inside]
+    if not len(start):
+        return np.zeros(horizon), np.zeros(horizon)
+
+    profiles, profile = _profile_groups(probs)
+    # 분포 번호 순으로 정렬된 (분포, 간격) 묶음, 노트는 묶음 순으로 정렬
+    keys, group = np.unique(np.stack([profile, intervals], axis=1), axis=0, return_inverse=True)
+    order = np.argsort(group.ravel(), kind="stable")
+    note_group, note_start = group.ravel()[order], start[order]
+
+    codes = np.arange(len(DIFFICULTIES))
+    first = calculate_next_intervals(codes, keys[:, 1, None], growth_factors)
+    reachable = _reachable_intervals(first[first < horizon], horizon, growth_factors)
+    # (기간 x 간격 수 x 분포 수) 원소 수 제한 (float32라 float64 CHUNK_ELEMENTS개와 같은 메모리)
+    per_chunk = max(1, 2 * CHUNK_ELEMENTS // (max(len(reachable), 1) * (horizon + 1)))
+    jobs = []
+    for lo in range(0, len(profiles), per_chunk):
+        hi = min(lo + per_chunk, len(profiles))
+        group_lo, group_hi = np.searchsorted(keys[:, 0], [lo, hi])
+        note_lo, note_hi = np.searchsorted(note_group, [group_lo, group_hi])
+        jobs.append((
+            profiles[lo:hi], reachable, keys[group_lo:group_hi, 0] - lo, keys[group_lo:group_hi, 1],
+            note_group[note_lo:note_hi] - group_lo, note_start[note_lo:note_hi], horizon, growth_factors,
+        ))
+
+    results = run_jobs(_chunk_moments, jobs, workers)
+    mean = np.sum([total for total, _ in results], axis=0)
+    square = np.sum([square for _, square in results], axis=0)
+    return mean, np.maximum(mean - square, 0.0)
+
+
+def forecast_review_load(offsets, intervals, counts, horizon=365, growth_factors=GROWTH_FACTORS, workers=FORECAST_WORKERS):
+    """
+    전체 노트의 향후 horizon일 동안의 일별 복습량을 예측합니다.
+    평균과 분산은 review_load_moments로 구하고, 분위수는 정규 근사로 계산합니다.
+    (하루 복습량은 노트별 독립 시행의 합이라 노트가 많을수록 정규분포에 가까움)
+    반환값: {'mean', 'p10', 'p50', 'p90'} 일별 배열
+    """
+    mean, variance = review_load_moments(offsets, intervals, difficulty_probabilities(counts), horizon, growth_factors, workers)
+    spread = Z_90 * np.sqrt(variance)
+    return {'mean': mean, 'p10': np.maximum(mean - spread, 0.0), 'p50': mean, 'p90': mean + spread}
@@ -0,0 +1,155 @@
+import re
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+# 정답 키와 채점 결과 캐시 크기 (재실행마다 같은 답안을 다시 채점해도 바로 반환)
+ANSWER_KEY_CACHE_SIZE = 10_000
+GRADE_CACHE_SIZE = 10_000
+
+# 허용하는 오타 수: 정답 키(자모 단위) 길이의 MAX_ERROR_RATIO 비율, 최대 MAX_EDITS개
+# 한글 한 글자를 잘못 쓰면 자모 1~3개가 달라지므로 자모 단위로 셈
+MAX_ERROR_RATIO = 0.1
+MAX_EDITS = 6
+
+# 정답 키를 만들 때 지우는 문자 분류 (문장 부호, 공백/구분자, 제어 문자)
+# 단, 숫자에 붙은 문장 부호(3.14, 1/2, -5)는 값이 달라지므로 남김 (_is_numeric_punctuation 참고)
+_FOLDED_CATEGORIES = ("P", "Z", "C")
+# 천 단위 구분 쉼표 (1,000 -> 1000으로 맞춤)
+_DIGIT_GROUPING = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+# 숫자 앞의 빼기/대시 기호는 모두 '-'로 맞춤
+_MINUS_SIGNS = {"\u2212"}
+
+GradeResult = namedtuple("GradeResult", ["correct", "exact", "distance"])
+
+
+# --- 정답 키 ---
+def _is_numeric_punctuation(text, i):
+    """
+    text[i]가 숫자 사이(3.14, 1/2, 12:30)에 있거나, 글자 뒤가 아닌 곳에서 숫자 앞에 붙은(-5, .5) 문장 부호인지
+    (COVID-19처럼 글자 뒤에 이어진 하이픈은 지움. 공백을 지운 키와 결과가 같도록 앞쪽 공백은 건너뛰고 봄)
+    """
+    if i + 1 >= len(text) or not text[i + 1].isdigit():
+        return False
+    previous = text[:i].rstrip()
+    return not previous or previous[-1].isdigit() or not previous[-1].isalnum()
+
+
+def normalize_answer(text):
+    """
+    답안을 비교용 키로 바꿉니다.
+    NFKC로 전각/호환 문자를 맞추고 대소문자를 접은 뒤 공백과 문장 부호를 지우고,
+    NFD로 한글 음절을 자모로 풀어 받침 하나 틀린 것도 작은 편집 거리로 잡히게 합니다.
+    숫자에 붙은 문장 부호는 남겨 "3.14"와 "314", "-5"와 "5"가 같은 답이 되지 않게 합니다.
+    """
+    text = _DIGIT_GROUPING.sub("", unicodedata.normalize("NFKC", text or "").casefold())
+    kept = []
+    for i, ch in enumerate(text):
+        category = unicodedata.category(ch)
+        if category.startswith("P") and _is_numeric_punctuation(text, i):
+            kept.append("-" if category == "Pd" else ch)
+        elif ch in _MINUS_SIGNS:
+            kept.append("-")
+        elif not category.startswith(_FOLDED_CATEGORIES):
+            kept.append(ch)
+    return unicodedata.normalize("NFD", "".join(kept))
+
+
+@lru_cache(maxsize=ANSWER_KEY_CACHE_SIZE)
+def answer_key(text):
+    return normalize_answer(text)
+
+
+def note_answer(note):
+    """노트의 정답 (질답 노트는 답변, 플래시카드는 뒷면)"""
+    return note["content"].get("answer") or note["content"].get("back") or ""
+
+
+def note_answer_key(note):
+    """저장할 때 만들어 둔 정답 키를 쓰고, 없으면(아직 저장 전인 노트) 바로 만듭니다."""
+    return note.get("answer_key") or answer_key(note_answer(note))
+
+
+# --- 편집 거리 ---
+def error_limit(key):
+    return min(MAX_EDITS, int(len(key) * MAX_ERROR_RATIO))
+
+
+def bounded_distance(a, b, limit):
+    """
+    a와 b의 편집(레벤슈타인) 거리가 limit 이하이면 그 값을, 넘으면 limit + 1을 반환합니다.
+    길이 차이가 limit보다 크면 바로 끝내고, 대각선 양쪽 limit칸의 띠만 계산하며,
+    한 줄의 최솟값이 limit을 넘으면 남은 줄을 계산하지 않습니다.
+    """
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > limit:
+        return limit + 1
+    # 같은 앞부분/뒷부분은 거리에 영향이 없으므로 잘라냄
+    start = 0
+    while start < len(a) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a:
+        return len(b) if len(b) <= limit else limit + 1
+
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i, ch in enumerate(a, 1):
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        row_min = current[0]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            value = min(
+                previous[j - 1] + (ch != b[j - 1]),  # 바꾸기
+                previous[j] + 1,  # 지우기
+                current[j - 1] + 1,  # 넣기
+            )
+            current[j] = value if value < over else over
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous = current
+    return previous[len(b)]
+
+
+# --- 채점 ---
+def _grade_keys(response_key, key):
+    """정답 키와 답안 키로 채점합니다. 정답 키가 비어 있으면 답안도 비어 있어야 정답입니다."""
+    if response_key == key:
+        return GradeResult(True, True, 0)
+    limit = error_limit(key)
+    distance = bounded_distance(response_key, key, limit)
+    return GradeResult(distance <= limit, False, distance)
+
+
+# 화면에서 채점한 결과만 캐시 (일괄 채점한 답안이 캐시를 밀어내지 않도록)
+grade_keys = lru_cache(maxsize=GRADE_CACHE_SIZE)(_grade_keys)
+
+
+def grade_answer(response, note):
+    """
+    답안 하나를 노트의 정답과 비교합니다. 반환값: GradeResult(정답 여부, 오타 없이 일치, 편집 거리)
+    편집 거리는 허용 오타 수를 넘으면 더 세지 않고 허용 수 + 1로 반환합니다.
+    """
+    return grade_keys(answer_key(response), note_answer_key(note))
+
+
+def grade_batch(responses, notes):
+    """
+    답안지 여러 줄을 한 번에 채점합니다.
+    responses: (note_id, 답안) 목록, notes: note_id -> 노트
+    반환값: 답안 순서대로 GradeResult (노트가 없는 답안은 None)
+    """
+    keys = {note_id: note_answer_key(note) for note_id, note in notes.items()}
+    return [
+        _grade_keys(normalize_answer(response), keys[note_id]) if note_id in keys else None
+        for note_id, response in responses
+    ]
@@ -0,0 +1,233 @@
+import argparse
+from datetime import date
+
+import numpy as np
+
+from parallel import CHUNK_ELEMENTS, run_jobs, workers_from_env
+from review_log import LAPSE_CODES
+from scheduler import DIFFICULTIES, FORGOT_CODE, GROWTH_FACTORS
+
+# 목표 기억률: 다음 복습일에 이 확률 이상으로 기억하는 가장 긴 간격을 고름 (= 같은 기억률에서 복습량 최소)
+DEFAULT_TARGET_RECALL = 0.9
+TARGET_RECALL_RANGE = (0.7, 0.97)
+
+# 배수를 맞추는 난이도 ('전혀 기억나지 않음'은 항상 1일 뒤에 다시 복습하므로 제외)
+FITTED_CODES = tuple(range(FORGOT_CODE))
+# 기억했다고 평가한 난이도('쉬웠음', '보통')는 간격이 줄지 않도록 배수를 1 이상으로 맞춤
+# (기억하고도 간격이 줄면 복습량이 오히려 늘어남)
+GROWING_CODES = tuple(code for code in FITTED_CODES if code not in LAPSE_CODES)
+MIN_GROWING_MULTIPLIER = 1.0
+
+# 난이도 하나의 배수를 맞추는 데 필요한 최소 (평가 -> 다음 복습) 쌍 수
+# 이보다 적으면 상위 값(카테고리는 사용자 전체 값, 사용자 전체는 기본 배수)을 그대로 씀
+MIN_FIT_PAIRS = 100
+
+# 맞춘 배수의 허용 범위 (기록이 한쪽으로 치우쳐도 간격이 극단적으로 바뀌지 않도록)
+MULTIPLIER_RANGE = (0.2, 5.0)
+
+# 망각 속도 k를 찾는 로그 간격 격자 (최적값 주변은 REFINE_POINTS개 격자로 한 번 더 찾음)
+DECAY_GRID = np.geomspace(1e-3, 20.0, 96)
+REFINE_POINTS = 64
+
+# 카테고리별 맞추기에 사용할 프로세스 수 (0 또는 미설정이면 현재 프로세스에서 실행)
+OPTIMIZER_WORKERS = workers_from_env("OPTIMIZER_WORKERS")
+
+# 압축 키의 비트 배치: (그룹, 난이도) | 경과 일수 | 이전 간격
+_DAY_BITS = 20
+_DAY_MASK = (1 << _DAY_BITS) - 1
+
+
+# --- 복습 기록 -> (평가, 다음 복습 결과) 쌍 ---
+def review_pairs(note_ids, days, codes, intervals, groups):
+    """
+    노트별로 기록 순서대로 정렬된 복습 이벤트를 '평가 -> 다음 복습' 쌍으로 바꿉니다.
+    평가 시점의 이전 간격(스케줄러가 받은 last_interval)은 같은 노트의 직전 이벤트가 정한 간격이고,
+    노트의 첫 평가는 새 노트의 첫 간격(1일)을 씁니다.
+    반환값: 쌍마다 (그룹 번호, 평가 난이도 코드, 경과 일수, 이전 간격, 다음 복습에서 기억했는지)
+    """
+    same_note = note_ids[1:] == note_ids[:-1]
+    i = np.flatnonzero(same_note)
+    has_previous = np.zeros(len(note_ids), dtype=bool)
+    has_previous[1:] = same_note
+    base = np.where(has_previous[i], intervals[i - 1], 1).astype(np.int64)
+    elapsed = (days[i + 1] - days[i]).astype(np.int64)
+    grade = codes[i].astype(np.int64)
+    recalled = ~np.isin(codes[i + 1], LAPSE_CODES)
+    keep = (elapsed > 0) & (grade < FORGOT_CODE)
+    return groups[i][keep], grade[keep], elapsed[keep], np.maximum(base[keep], 1), recalled[keep]
+
+
+def compress_pairs(groups, grades, elapsed, base, recalled):
+    """
+    같은 (그룹, 난이도, 경과 일수, 이전 간격) 쌍을 하나로 묶어 기억/망각 횟수만 남깁니다.
+    이후 계산량은 이벤트 수가 아니라 서로 다른 조합 수에 비례하므로 수백만 건도 빠르게 맞출 수 있습니다.
+    반환값: (키로 정렬된 (그룹, 난이도) 번호, 경과 비율 x, 기억 횟수, 망각 횟수)
+    """
+    keys = (
+        ((groups.astype(np.int64) * len(DIFFICULTIES) + grades) << (2 * _DAY_BITS))
+        | (np.minimum(elapsed, _DAY_MASK) << _DAY_BITS)
+        | np.minimum(base, _DAY_MASK)
+    )
+    unique, inverse = np.unique(keys, return_inverse=True)
+    recalled_counts = np.bincount(inverse, weights=recalled, minlength=len(unique))
+    lapsed_counts = np.bincount(inverse, weights=~recalled, minlength=len(unique))
+    x = ((unique >> _DAY_BITS) & _DAY_MASK) / (unique & _DAY_MASK)
+    return unique >> (2 * _DAY_BITS), x, recalled_counts, lapsed_counts
+
+
+# --- 망각 곡선 맞추기 ---
+def _log_likelihood(x, recalled, lapsed, decays):
+    """격자의 k마다 로그 우도 Σ 기억·(-k·x) + 망각·log(1 - exp(-k·x))"""
+    total = np.zeros(len(decays))
+    step = max(1, CHUNK_ELEMENTS // len(decays))  # (서로 다른 경과 비율 수 x 격자 크기) 원소 수 제한
+    for start in range(0, len(x), step):
+        kx = np.outer(x[start:start + step], decays)
+        total += recalled[start:start + step] @ -kx
+        total += lapsed[start:start + step] @ np.log(-np.expm1(-kx))
+    return total
+
+
+def fit_decay(x, recalled, lapsed):
+    """
+    기억 확률 p = exp(-k·x) (x = 경과 일수 / 이전 간격)의 망각 속도 k를 최대우도로 찾습니다.
+    로그 격자 전체에서 최댓값을 찾은 뒤, 그 양옆 격자 사이를 세밀한 격자로 한 번 더 찾습니다.
+    """
+    best = int(np.argmax(_log_likelihood(x, recalled, lapsed, DECAY_GRID)))
+    fine = np.geomspace(DECAY_GRID[max(best - 1, 0)], DECAY_GRID[min(best + 1, len(DECAY_GRID) - 1)], REFINE_POINTS)
+    return float(fine[np.argmax(_log_likelihood(x, recalled, lapsed, fine))])
+
+
+def _fit_group(args):
+    """
+    한 그룹(사용자 전체 또는 카테고리 하나)의 난이도별 간격 배수를 맞춥니다.
+    목표 기억률 R에서 다음 복습일의 기억 확률이 R이 되는 배수 m = -ln R / k 를 고릅니다.
+    ('쉬웠음'/'보통'은 MIN_GROWING_MULTIPLIER 이상)
+    """
+    grades, fallback, target_recall = args
+    multipliers, decays, pairs = list(fallback), [], []
+    for code, (x, recalled, lapsed) in zip(FITTED_CODES, grades):
+        count = int(recalled.sum() + lapsed.sum())
+        pairs.append(count)
+        if count < MIN_FIT_PAIRS:
+            decays.append(None)
+            continue
+        decay = fit_decay(x, recalled, lapsed)
+        decays.append(decay)
+        multiplier = float(np.clip(-np.log(target_recall) / decay, *MULTIPLIER_RANGE))
+        if code in GROWING_CODES:
+            multiplier = max(multiplier, MIN_GROWING_MULTIPLIER)
+        multipliers[code] = multiplier
+    # 평가가 좋을수록 간격이 짧아지지 않도록 쉬웠음 >= 보통 >= 어려웠음 순서를 유지
+    multipliers = np.minimum.accumulate(multipliers).tolist()
+    return {"multipliers": multipliers, "decays": decays, "pairs": pairs}
+
+
+def _split_grades(group_grade, x, recalled, lapsed, start, end, group):
+    """압축된 쌍(키로 정렬됨)에서 한 그룹의 난이도별 (x, 기억 횟수, 망각 횟수)를 잘라냅니다."""
+    rows = slice(start, end)
+    bounds = np.searchsorted(group_grade[rows], group * len(DIFFICULTIES) + np.arange(len(FITTED_CODES) + 1))
+    return [
+        (x[rows][lo:hi], recalled[rows][lo:hi], lapsed[rows][lo:hi])
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def fit_interval_params(pairs, category_names, target_recall=DEFAULT_TARGET_RECALL, workers=OPTIMIZER_WORKERS):
+    """
+    review_pairs 결과로 사용자 전체와 카테고리별 간격 배수를 맞춥니다.
+    카테고리는 서로 독립이므로 workers가 주어지면 프로세스 풀에서 병렬로 맞춥니다.
+    반환값: 저장소에 그대로 저장하고 scheduler.growth_factors_for로 읽는 딕셔너리
+    """
+    groups, grades, elapsed, base, recalled = pairs
+
+    # 사용자 전체: 그룹을 하나로 합쳐 맞춤
+    total = compress_pairs(np.zeros_like(groups), grades, elapsed, base, recalled)
+    default = _fit_group((_split_grades(*total, 0, len(total[0]), 0), GROWTH_FACTORS[:FORGOT_CODE], target_recall))
+
+    # 카테고리별: 쌍이 충분한 카테고리만 맞추고, 모자란 난이도는 사용자 전체 값을 씀
+    group_grade, x, recalled_counts, lapsed_counts = compress_pairs(groups, grades, elapsed, base, recalled)
+    group_of_row = group_grade // len(DIFFICULTIES)
+    bounds = np.searchsorted(group_of_row, np.arange(len(category_names) + 1))
+    pair_counts = np.bincount(groups, minlength=len(category_names))
+    jobs, names = [], []
+    for group, name in enumerate(category_names):
+        if pair_counts[group] < MIN_FIT_PAIRS:
+            continue
+        start, end = bounds[group], bounds[group + 1]
+        jobs.append((
+            _split_grades(group_grade, x, recalled_counts, lapsed_counts, start, end, group),
+            default["multipliers"],
+            target_recall,
+        ))
+        names.append(name)
+
+    results = run_jobs(_fit_group, jobs, workers)
+
+    return {
+        "target_recall": target_recall,
+        "fitted_on": date.today().isoformat(),
+        "pairs": int(len(groups)),
+        "default": default,
+        "categories": dict(zip(names, results)),
+    }
+
+
+# --- 저장소에서 읽어 맞추기 ---
+def collect_review_pairs(store):
+    """저장소의 복습 기록을 (평가 -> 다음 복습) 쌍 배열과 카테고리 이름 목록으로 만듭니다."""
+    columns = store.review_log().to_numpy()
+    order = np.argsort(columns["note_id"], kind="stable")  # 노트별로 모으고 노트 안에서는 기록 순서 유지
+    note_ids = columns["note_id"][order]
+
+    category_of = dict(store.note_categories())
+    category_names = sorted(set(category_of.values()))
+    category_index = {name: i for i, name in enumerate(category_names)}
+    unique_ids, inverse = np.unique(note_ids, return_inverse=True)
+    note_groups = np.fromiter(
+        (category_index[category_of[note_id]] for note_id in unique_ids.tolist()), dtype=np.int64, count=len(unique_ids)
+    )
+    pairs = review_pairs(
+        note_ids,
+        columns["day"][order],
+        columns["difficulty"][order],
+        columns["interval_used"][order],
+        note_groups[inverse],
+    )
+    return pairs, category_names
+
+
+def optimize_intervals(store, target_recall=DEFAULT_TARGET_RECALL, workers=OPTIMIZER_WORKERS):
+    """저장소의 복습 기록으로 간격 배수를 맞춰 반환합니다. (저장은 호출한 쪽에서)"""
+    pairs, category_names = collect_review_pairs(store)
+    return fit_interval_params(pairs, category_names, target_recall=target_recall, workers=workers)
+
+
+def expected_recall(decay, multiplier):
+    """망각 속도 decay에서 간격 배수 multiplier로 복습할 때 다음 복습일의 예상 기억률"""
+    return float(np.exp(-decay * multiplier))
+
+
+# --- 명령줄 실행 (복습 기록이 많을 때 Streamlit 밖에서 맞추고 저장) ---
+if __name__ == "__main__":
+    from note_store import DEFAULT_DB_PATH, DEFAULT_USER, SQLiteNoteStore
+
+    parser = argparse.ArgumentParser(description="복습 기록으로 난이도별 간격 배수를 맞춰 저장합니다.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--user", default=DEFAULT_USER)
+    parser.add_argument("--target-recall", type=float, default=DEFAULT_TARGET_RECALL)
+    parser.add_argument("--workers", type=int, default=OPTIMIZER_WORKERS)
+    parser.add_argument("--dry-run", action="store_true", help="저장하지 않고 결과만 출력")
+    args = parser.parse_args()
+
+    store = SQLiteNoteStore(args.db, args.user)
+    params = optimize_intervals(store, target_recall=args.target_recall, workers=args.workers)
+    print(f"복습 쌍 {params['pairs']:,}개, 목표 기억률 {params['target_recall']:.0%}")
+    for name, fitted in [("(전체)", params["default"]), *params["categories"].items()]:
+        factors = ", ".join(
+            f"{DIFFICULTIES[code]} {multiplier:.2f} ({pairs}쌍)"
+            for code, (multiplier, pairs) in enumerate(zip(fitted["multipliers"], fitted["pairs"]))
+        )
+        print(f"  {name or '카테고리 없음'}: {factors}")
+    if not args.dry_run:
+        store.set_interval_params(params)
+        print("저장했습니다.")
@@ -1,42 +1,188 @@
 import streamlit as st
+import os
+import time
 from datetime import datetime, timedelta
 import pandas as pd
 
+from bulk_io import ANSWER_SHEET_FORMATS, EXPORT_FORMATS, IMPORT_FORMATS, export_notes_bytes, grade_answer_sheet, guess_format, import_notes
+from forecast import FORECAST_HORIZONS, collect_forecast_inputs, forecast_review_load
+from grading import grade_answer
+from interval_optimizer import DEFAULT_TARGET_RECALL, TARGET_RECALL_RANGE, expected_recall, optimize_intervals
+from note_repository import NoteRepository
+from note_store import DEFAULT_DB_PATH, DEFAULT_USER, ConflictError, ConnectionPool, SQLiteNoteStore, is_valid_user_id
+from profiling import PROFILING_ENV, STAGE_LABELS, RerunProfiler, cprofile_summary, stage
+from notes import NOTE_TYPES, QA_NOTE_TYPE, REVIEW_MODES, is_content_empty
+from scheduler import DIFFICULTIES, FORGOT_CODE, GROWTH_FACTORS, growth_factors_for
+
+SEARCH_PAGE_SIZE = 50 # 검색 결과 한 페이지에 보여줄 노트 수
+NOTES_PAGE_SIZE = 100 # 노트 목록 한 페이지에 보여줄 노트 수
+DIFFICULT_PAGE_SIZE = 50 # 오답 노트 한 페이지에 보여줄 노트 수
+REVIEW_PAGE_SIZES = [10, 20, 50, 100] # 복습 목록 한 페이지에 보여줄 노트 수 선택지
+REVIEW_SESSION_SIZE = 50 # 연속 복습 세션에 미리 가져올 카드 수
+SESSION_FLUSH_EVERY = 5 # 평가 결과를 이만큼 모으면 저장 (탭을 닫아도 잃는 평가가 거의 없도록 작게 유지)
+SESSION_FLUSH_SECONDS = 5 # 마지막 저장 후 이 시간(초)이 지나면 저장
+MAX_CACHED_USERS = int(os.environ.get("REVIEW_MAX_CACHED_USERS", "64")) # 메모리에 색인을 유지할 사용자 수 (넘으면 오래된 사용자부터 내보냄)
+USER_ID_HELP = "사용자 이름은 글자, 숫자, '_', '-', '.' 로 된 1~32자여야 합니다."
+
+# 난이도 평가 버튼 (버튼 이름, 난이도, 키 접미사)
+DIFFICULTY_BUTTONS = [
+    ("😊 쉬웠음", "쉬웠음", "easy"),
+    ("🙂 보통", "보통", "normal"),
+    ("🙁 어려웠음", "어려웠음", "hard"),
+    ("😩 전혀 기억 안 남", "전혀 기억나지 않음", "forgot"),
+]
+
+# --- 공유 저장소 (모든 세션이 함께 사용) ---
+@st.cache_resource
+def get_connection_pool(db_path):
+    """데이터베이스 하나에 연결 풀 하나. 열린 탭 수와 관계없이 연결 수가 일정합니다."""
+    return ConnectionPool(db_path)
+
+@st.cache_resource(max_entries=MAX_CACHED_USERS)
+def get_repository(db_path, user_id):
+    """
+    사용자마다 저장소 하나 (ID 캐시, 복습 스냅샷, 검색 색인, 노트 표 포함).
+    같은 사용자의 탭은 모두 이 객체를 함께 쓰므로, 서버 메모리는 탭 수가 아니라 사용자 데이터에 비례합니다.
+    MAX_CACHED_USERS명을 넘으면 가장 오래 쓰지 않은 사용자의 저장소를 내보냅니다. (다음 접속 때 다시 만듦)
+    """
+    return NoteRepository(SQLiteNoteStore(db_path, user_id, pool=get_connection_pool(db_path)))
+
 # --- 세션 상태 초기화 함수 ---
 def initialize_session_state():
-    if 'notes' not in st.session_state:
-        st.session_state.notes = [] # 모든 노트를 저장할 리스트
+    if 'user_id' not in st.session_state:
+        user_id = st.query_params.get("user") or DEFAULT_USER # ?user= 로 사용자 지정
+        if not is_valid_user_id(user_id):
+            st.warning(f"주소의 사용자 이름이 올바르지 않아 기본 사용자로 시작합니다. {USER_ID_HELP}")
+            user_id = DEFAULT_USER
+            st.query_params["user"] = user_id
+        st.session_state.user_id = user_id
+    # 노트 읽기/쓰기는 모두 공유 저장소를 거침 (세션에는 화면 상태만 보관)
+    st.session_state.repository = get_repository(DEFAULT_DB_PATH, st.session_state.user_id)
     if 'page' not in st.session_state:
         st.session_state.page = 'home' # 현재 페이지 관리
     if 'selected_note_for_review_id' not in st.session_state: # 선택된 노트의 ID를 저장
         st.session_state.selected_note_for_review_id = None
-    if 'user_goal' not in st.session_state:
-        st.session_state.user_goal = ""
 
-# --- 복습 주기 계산 함수 ---
-def calculate_next_review_date(current_date, difficulty, last_interval=0):
+def change_user():
+    """사용자를 바꾸면 이전 사용자의 복습 세션(모아 둔 평가는 저장)과 선택한 노트를 버립니다."""
+    user_id = st.session_state.user_id_input.strip() or DEFAULT_USER
+    if not is_valid_user_id(user_id):
+        st.session_state.user_id_input = st.session_state.user_id # 입력을 되돌리고 사용자는 그대로 유지
+        st.error(USER_ID_HELP)
+        return
+    flush_pending_grades() # 아직 이전 사용자의 저장소를 가리키는 동안 저장
+    st.session_state.user_id = user_id
+    st.session_state.user_id_input = user_id
+    st.query_params["user"] = user_id # 새로고침/링크 공유 시에도 같은 사용자
+    st.session_state.selected_note_for_review_id = None
+    st.session_state.pop('review_session', None)
+
+# --- 연속 복습 세션 함수 ---
+def start_review_session(note_ids):
+    """복습할 카드를 미리 가져와 세션 큐를 만듭니다. 이전 세션에서 모아 둔 평가는 먼저 저장합니다."""
+    flush_pending_grades()
+    st.session_state.review_session = {
+        'queue': st.session_state.repository.get_many(note_ids[:REVIEW_SESSION_SIZE]),
+        'position': 0, # 현재 카드 위치
+        'show_back': False,
+        'grades': [], # 아직 저장하지 않은 평가 (note_id, 난이도)
+        'last_flush': time.monotonic(),
+        'graded': 0,
+    }
+
+def flush_review_session(session):
     """
-    난이도와 이전 복습 간격에 따라 다음 복습 날짜를 계산합니다.
-    last_interval: 이전 복습까지의 일수 (첫 복습 시 0)
-    difficulty: '쉬웠음', '보통', '어려웠음', '전혀 기억나지 않음'
+    세션에서 모아 둔 평가 결과를 한 번의 트랜잭션으로 저장합니다.
+    다른 탭/사용자가 그사이 같은 노트를 평가했으면 최신 노트에 평가를 다시 적용하므로 어느 쪽 평가도 사라지지 않습니다.
     """
-    if difficulty == '쉬웠음':
-        # 이전 간격이 길수록 다음 간격도 더 길게 (지수적으로 증가)
-        next_interval = max(1, int(last_interval * 1.8) if last_interval > 0 else 7)
-    elif difficulty == '보통':
-        # 이전 간격보다 조금 더 길게
-        next_interval = max(1, int(last_interval * 1.2) if last_interval > 0 else 3)
-    elif difficulty == '어려웠음':
-        # 이전 간격보다 짧게, 빠르게 다시 복습
-        next_interval = max(1, int(last_interval * 0.5) if last_interval > 0 else 1)
-    else: # '전혀 기억나지 않음'
-        # 거의 즉시 다시 복습 (내일)
-        next_interval = 1
-    
-    return current_date + timedelta(days=next_interval), next_interval
+    if session['grades']:
+        st.session_state.repository.record_reviews(session['grades'], st.session_state.repository.today)
+        session['grades'] = []
+    session['last_flush'] = time.monotonic()
+
+def flush_pending_grades():
+    """진행 중인 연속 복습 세션이 있으면 모아 둔 평가를 저장합니다. (세션을 바꾸거나 페이지를 떠나기 전에 호출)"""
+    session = st.session_state.get('review_session')
+    if session is not None:
+        flush_review_session(session)
+
+def grade_session_card(difficulty):
+    """연속 복습 중 현재 카드를 평가하고 다음 카드로 넘어갑니다. 평가 결과는 모아 두었다가 한 번에 저장합니다."""
+    session = st.session_state.review_session
+    note = session['queue'][session['position']]
+    session['grades'].append((note['id'], difficulty))
+    session['position'] += 1
+    session['show_back'] = False
+    session['graded'] += 1
+    if len(session['grades']) >= SESSION_FLUSH_EVERY or time.monotonic() - session['last_flush'] >= SESSION_FLUSH_SECONDS:
+        flush_review_session(session)
+
+def continue_review_session():
+    graded = st.session_state.review_session['graded']
+    start_review_session(st.session_state.repository.due_snapshot.due_ids())
+    st.session_state.review_session['graded'] = graded
+
+@st.fragment
+def review_session_card():
+    """
+    연속 복습 카드. 버튼은 콜백으로 처리하고 프래그먼트 안에서만 다시 실행되므로,
+    카드를 평가해도 앱 전체가 재실행되지 않습니다.
+    """
+    session = st.session_state.review_session
+    queue = session['queue']
+
+    if session['position'] >= len(queue):
+        flush_review_session(session)
+        st.success(f"이번 세션의 노트 {session['graded']}개를 모두 복습하고 저장했습니다! 🎉")
+        remaining = st.session_state.repository.due_snapshot.count()
+        if remaining:
+            st.button(f"다음 카드 이어서 복습하기 (남은 노트 {remaining}개)", key="session_continue", on_click=continue_review_session)
+        return
+
+    note = queue[session['position']]
+    st.progress(session['position'] / len(queue), text=f"{session['position'] + 1} / {len(queue)} | {note['title']}")
+
+    st.subheader("💡 앞면")
+    st.write(f"**{note['content'].get('front') or note['content'].get('question')}**")
+    if session['show_back']:
+        st.subheader("✅ 뒷면")
+        st.info(f"**{note['content'].get('back') or note['content'].get('answer')}**")
+    else:
+        st.button("뒷면 확인", key=f"session_show_back_{session['position']}", on_click=lambda: session.update(show_back=True))
+
+    st.write("---")
+    st.subheader("이해 난이도 평가:")
+    for col, (label, difficulty, key_suffix) in zip(st.columns(4), DIFFICULTY_BUTTONS):
+        with col:
+            st.button(label, key=f"session_diff_{key_suffix}_{session['position']}", on_click=grade_session_card, args=(difficulty,))
+
+# --- 성능 측정 패널 ---
+def render_profiling_panel(profiler):
+    """사이드바 디버그 패널: 직전 재실행의 단계별 시간, 최근 백분위수, JSON/cProfile 내보내기"""
+    run = profiler.last_run
+    st.markdown("---")
+    with st.expander("🛠 성능 측정", expanded=True):
+        st.caption(f"페이지: {run['page']}" + (" (중간에 다시 실행됨)" if run['interrupted'] else ""))
+        st.dataframe(
+            pd.DataFrame(
+                [(STAGE_LABELS.get(name, name), round(value['ms'], 2), value['calls']) for name, value in run['stages'].items()],
+                columns=["단계", "시간(ms)", "호출 수"],
+            ),
+            hide_index=True,
+        )
+        st.caption(f"최근 재실행 백분위수 (단계별 최대 {profiler.history_size}회)")
+        st.dataframe(pd.DataFrame(profiler.percentiles()), hide_index=True)
+        st.download_button("JSON으로 내보내기", profiler.to_json(), file_name="rerun_profile.json", mime="application/json", key="profiler_export_json")
+        # cProfile은 부하가 크므로 따로 켬 (다음 재실행부터 기록)
+        profiler.use_cprofile = st.toggle("cProfile 기록", key="profiler_use_cprofile")
+        if profiler.last_cprofile:
+            st.download_button("cProfile 덤프 내보내기 (.prof)", profiler.last_cprofile, file_name="rerun.prof", key="profiler_export_cprofile")
+            with st.popover("누적 시간 상위 함수"):
+                st.code(cprofile_summary(profiler.last_cprofile))
 
 # --- 페이지 이동 함수 ---
 def go_to_page(page_name):
+    flush_pending_grades() # 연속 복습 중 다른 페이지로 가도 평가가 사라지지 않도록
     st.session_state.page = page_name
     # 페이지 이동 시 현재 복습 중인 노트 ID는 유지 (single_review에서 사용)
     # 다른 복습 관련 임시 변수들은 초기화
@@ -44,11 +190,34 @@ def go_to_page(page_name):
         st.session_state.selected_note_for_review_id = None
     st.rerun()
 
+# --- 복습량 예측 함수 ---
+# 노트가 바뀌면 사용자의 저장소 revision이 달라지므로 캐시가 자동으로 무효화됨
+@st.cache_data(show_spinner="복습량을 예측하는 중...", max_entries=16)
+def load_review_forecast(_store, db_path, user_id, revision, today, horizon, growth_factors=GROWTH_FACTORS):
+    offsets, intervals, counts = collect_forecast_inputs(_store, today)
+    return forecast_review_load(offsets, intervals, counts, horizon=horizon, growth_factors=growth_factors)
+
+# --- 카테고리/태그 목록 ---
+# 같은 사용자의 탭이 함께 쓰고, 노트를 저장/삭제하면 revision이 바뀌어 다시 읽음
+@st.cache_data(max_entries=64)
+def load_facets(_repository, db_path, user_id, revision):
+    return _repository.categories(), _repository.tags()
+
 # --- Streamlit 앱 시작 ---
 st.set_page_config(layout="wide", page_title="망각 곡선 극복 챌린지")
 
 initialize_session_state()
 
+# '오늘'은 재실행마다 한 번만 정하고 모든 페이지가 같은 값을 사용 (날짜가 바뀌면 복습 스냅샷도 새로 만듦)
+today = st.session_state.repository.begin_day(datetime.now().date())
+
+# 성능 측정은 REVIEW_PROFILING=1 또는 ?profile=1 로 켠 경우에만 (꺼져 있으면 계측 지점은 아무 일도 하지 않음)
+profiling_enabled = PROFILING_ENV or st.query_params.get("profile") == "1"
+if profiling_enabled:
+    if 'profiler' not in st.session_state:
+        st.session_state.profiler = RerunProfiler()
+    st.session_state.profiler.start_rerun(st.session_state.page)
+
 # --- 사이드바 메뉴 ---
 with st.sidebar:
     st.title("메뉴")
@@ -56,12 +225,23 @@ with st.sidebar:
         go_to_page('home')
     if st.button("새 노트 추가", key="sidebar_add_note"):
         go_to_page('add_note')
-    if st.button("오늘의 복습 목록", key="sidebar_review_list"): # 명칭 변경
+    due_snapshot = st.session_state.repository.due_snapshot
+    if st.button(f"오늘의 복습 목록 ({due_snapshot.count()})", key="sidebar_review_list"): # 명칭 변경
         go_to_page('review_list')
     if st.button("내 학습 통계 & 모든 노트", key="sidebar_stats"): # 명칭 변경
         go_to_page('stats')
+    if st.button("노트 가져오기/내보내기", key="sidebar_bulk"):
+        go_to_page('bulk')
+    # 카테고리별 오늘 복습할 노트 수 (스냅샷에서 바로 읽음)
+    due_by_category = due_snapshot.category_counts()
+    if due_by_category:
+        st.caption("오늘 복습: " + ", ".join(f"{category or '카테고리 없음'} {count}개" for category, count in list(due_by_category.items())[:5]))
     st.markdown("---")
-    st.info(f"**🎯 나의 목표:** {st.session_state.user_goal or '아직 설정되지 않음'}")
+    if 'user_id_input' not in st.session_state:
+        st.session_state.user_id_input = st.session_state.user_id
+    st.text_input("사용자", key="user_id_input", on_change=change_user, help="같은 사용자 이름을 쓰는 사람끼리 노트를 함께 씁니다.")
+    user_goal = st.session_state.repository.goal()
+    st.info(f"**🎯 나의 목표:** {user_goal or '아직 설정되지 않음'}")
 
 # --- 홈 페이지 ---
 if st.session_state.page == 'home':
@@ -77,10 +257,10 @@ if st.session_state.page == 'home':
     st.write("---")
     
     st.header("🎯 학습 목표 설정")
-    current_goal = st.session_state.user_goal
+    current_goal = user_goal
     new_goal = st.text_input("복습 앱을 통해 달성하고 싶은 학습 목표를 입력해주세요. (예: 파이썬 문법 마스터하기, 영어 단어 1000개 암기)", value=current_goal)
     if st.button("목표 설정 및 저장"):
-        st.session_state.user_goal = new_goal
+        st.session_state.repository.set_goal(new_goal)
         st.success(f"학습 목표가 '{new_goal}'으로 설정되었습니다!")
         st.rerun() # 사이드바 업데이트를 위해 새로고침
 
@@ -93,23 +273,22 @@ elif st.session_state.page == 'add_note':
     st.title("➕ 새로운 지식 추가하기")
     st.write("학습할 내용을 입력하고 복습 계획을 세워보세요.")
 
-    note_type = st.radio("노트 유형 선택", ["질답(Q&A) 노트", "외우기(플래시카드) 노트"], key="note_type_radio")
+    note_type = st.radio("노트 유형 선택", NOTE_TYPES, key="note_type_radio")
 
     title = st.text_input("노트 제목 (선택 사항)", help="이 노트의 전체적인 주제를 나타내는 제목입니다.")
     tags = st.text_input("태그 (쉼표로 구분, 예: #영어단어, #물리)", help="나중에 노트를 찾거나 분류할 때 유용합니다.")
     category = st.text_input("카테고리 (선택 사항, 예: TOEIC, 정보처리기사)", help="더 큰 범위의 학습 주제를 지정합니다.")
 
     content = {}
-    if note_type == "질답(Q&A) 노트":
+    if note_type == QA_NOTE_TYPE:
         question = st.text_area("질문 (앞면)", help="스스로에게 질문할 내용을 입력하세요.")
         answer = st.text_area("답변 (뒷면)", help="질문에 대한 정답을 입력하세요.")
         content = {"question": question, "answer": answer}
-        review_mode = "주관식" 
     else: # 외우기(플래시카드)
         front = st.text_area("앞면 (단어/개념)", help="카드 앞면에 보일 내용을 입력하세요. (예: 'apple', '뉴턴의 운동 제1법칙')")
         back = st.text_area("뒷면 (의미/설명)", help="카드 뒷면에 보일 내용을 입력하세요. (예: '사과', '관성의 법칙')")
         content = {"front": front, "back": back}
-        review_mode = "플래시카드"
+    review_mode = REVIEW_MODES[note_type]
 
     st.markdown("---")
     st.subheader("💡 이 노트의 추천 복습 모드")
@@ -117,36 +296,11 @@ elif st.session_state.page == 'add_note':
     st.write("물론, '오늘의 복습'에서 다른 모드를 선택할 수도 있습니다.")
 
     if st.button("노트 저장 및 복습 스케줄 생성"):
-        is_content_empty = False
-        if note_type == "질답(Q&A) 노트":
-            if not content.get("question") or not content.get("answer"):
-                is_content_empty = True
-        else: # 외우기(플래시카드) 노트
-            if not content.get("front") or not content.get("back"):
-                is_content_empty = True
-
-        if is_content_empty:
+        if is_content_empty(note_type, content):
             st.error("노트의 질문/앞면과 답변/뒷면 내용을 모두 입력해주세요.")
         else:
-            today = datetime.now().date()
-            
-            note_id = len(st.session_state.notes) # 간단한 ID 부여
-            
-            new_note = {
-                "id": note_id,
-                "type": note_type,
-                "title": title if title else (content.get("front") or content.get("question") or "새 노트")[:30] , # 제목 없으면 내용 앞부분 30자
-                "tags": [t.strip() for t in tags.split(',') if t.strip()],
-                "category": category,
-                "content": content,
-                "created_date": today,
-                "last_reviewed_date": None,
-                "next_review_date": today + timedelta(days=1), # 첫 복습은 1일 뒤
-                "review_history": [], # [{'date': date, 'difficulty': difficulty, 'interval': interval}]
-                "current_interval": 1, # 첫 복습 간격
-                "initial_review_mode": review_mode # 추천 복습 모드 저장
-            }
-            st.session_state.notes.append(new_note)
+            # ID는 저장소에서 단조 증가로 발급 (삭제된 노트가 있어도 겹치지 않음)
+            new_note = st.session_state.repository.create(note_type, title, tags, category, content, today)
             st.success(f"'{new_note['title']}' 노트가 저장되었고, 복습 스케줄이 생성되었습니다! 🎉")
             st.info(f"첫 복습은 **{new_note['next_review_date'].strftime('%Y년 %m월 %d일')}** 예정입니다.")
             st.balloons()
@@ -157,49 +311,90 @@ elif st.session_state.page == 'review_list':
     st.title("📚 오늘의 복습 목록")
     st.write("오늘 복습할 노트들을 확인하고, 원하는 노트를 선택하여 복습을 시작해보세요.")
 
-    today = datetime.now().date()
-    
-    # 오늘 복습할 항목 필터링 (next_review_date가 오늘보다 같거나 이전인 모든 노트)
-    notes_due_for_review = [
-        note for note in st.session_state.notes
-        if note['next_review_date'] and note['next_review_date'] <= today
-    ]
-    # 오래된 복습일수록 먼저 보여주기 위해 정렬
-    notes_due_for_review.sort(key=lambda x: x['next_review_date'])
-
-    if not notes_due_for_review:
+    # 오늘 복습할 항목 조회 (next_review_date가 오늘보다 같거나 이전인 모든 노트의 ID, 오래된 순서)
+    # 하루 단위 스냅샷이 평가할 때마다 정렬 위치만 고쳐 두므로 여기서는 정렬하지 않음
+    with stage("sorting"):
+        due_note_ids = st.session_state.repository.due_snapshot.due_ids()
+
+    if not due_note_ids:
         st.info("🎉 오늘 복습할 노트가 없네요! 새 노트를 추가하거나 잠시 쉬어가세요.")
         st.markdown("---")
         st.write("**💡 팁:** 새로운 지식을 추가하여 꾸준히 복습 스케줄을 만들어보세요.")
+        upcoming = st.session_state.repository.upcoming(3)
+        if upcoming:
+            st.caption("다가오는 복습: " + ", ".join(due_date.strftime('%Y-%m-%d') for _, due_date in upcoming))
         if st.button("새 노트 추가하러 가기", key="review_go_add_note_list"):
             go_to_page('add_note')
     else:
-        st.subheader(f"총 {len(notes_due_for_review)}개의 노트를 복습할 수 있어요!")
-        
-        # 각 노트를 개별적으로 표시하고 복습 시작 버튼 추가
-        for i, note in enumerate(notes_due_for_review):
-            col_title, col_date, col_button = st.columns([0.6, 0.2, 0.2])
-            with col_title:
-                st.markdown(f"**{note['title']}**")
-                st.caption(f"카테고리: {note['category'] or '없음'} | 태그: {', '.join(note['tags']) or '없음'}")
-            with col_date:
-                st.write(f"복습 예정일: {note['next_review_date'].strftime('%Y-%m-%d')}")
+        st.subheader(f"총 {len(due_note_ids)}개의 노트를 복습할 수 있어요!")
+
+        # 카테고리/태그/유형으로 거르기 (필터가 바뀌면 첫 페이지로)
+        reset_review_page = lambda: st.session_state.pop("review_list_page", None)
+        repository = st.session_state.repository
+        categories, tags = load_facets(repository, DEFAULT_DB_PATH, st.session_state.user_id, repository.revision())
+        col_category, col_tag, col_type, col_page_size = st.columns([0.3, 0.3, 0.25, 0.15])
+        with col_category:
+            category_filter = st.selectbox("카테고리", ["전체"] + categories, key="review_list_category", on_change=reset_review_page)
+        with col_tag:
+            tag_filter = st.selectbox("태그", ["전체"] + tags, key="review_list_tag", on_change=reset_review_page)
+        with col_type:
+            type_filter = st.selectbox("유형", ["전체"] + NOTE_TYPES, key="review_list_type", on_change=reset_review_page)
+        with col_page_size:
+            page_size = st.selectbox("페이지당 노트 수", REVIEW_PAGE_SIZES, index=1, key="review_list_page_size", on_change=reset_review_page)
+
+        with stage("due_filter"):
+            facet_ids = st.session_state.repository.filter_ids(
+                category=None if category_filter == "전체" else category_filter,
+                tag=None if tag_filter == "전체" else tag_filter,
+                note_type=None if type_filter == "전체" else type_filter,
+            )
+            if facet_ids is not None:
+                due_note_ids = [note_id for note_id in due_note_ids if note_id in facet_ids]
+
+        if not due_note_ids:
+            st.info("조건에 맞는 복습 노트가 없습니다.")
+        else:
+            if st.button(f"⚡ 연속 복습 시작 (최대 {REVIEW_SESSION_SIZE}개)", key="start_review_session"):
+                start_review_session(due_note_ids)
+                go_to_page('review_session')
+
+            page_count = (len(due_note_ids) + page_size - 1) // page_size
+            if st.session_state.get("review_list_page", 1) > page_count: # 복습을 마쳐 페이지 수가 줄어든 경우
+                st.session_state.review_list_page = page_count
+            review_page = st.session_state.get("review_list_page", 1)
+            # 현재 페이지에 보이는 노트만 저장소에서 읽어옴
+            page_notes = st.session_state.repository.get_many(due_note_ids[(review_page - 1) * page_size:review_page * page_size])
+            notes_by_id = {note['id']: note for note in page_notes}
+
+            with stage("widgets"):
+                # 노트마다 버튼을 만들지 않고, 한 페이지를 하나의 선택 목록으로 표시
+                selected_id = st.radio(
+                    f"복습할 노트 선택 ({len(due_note_ids)}개 중 {(review_page - 1) * page_size + 1}~{(review_page - 1) * page_size + len(page_notes)}번째)",
+                    list(notes_by_id),
+                    format_func=lambda note_id: (
+                        f"**{notes_by_id[note_id]['title']}** — 카테고리: {notes_by_id[note_id]['category'] or '없음'}"
+                        f" | 태그: {', '.join(notes_by_id[note_id]['tags']) or '없음'}"
+                        f" | 복습 예정일: {notes_by_id[note_id]['next_review_date'].strftime('%Y-%m-%d')}"
+                    ),
+                    key=f"review_list_selection_{review_page}",
+                )
+
+            col_page, col_button = st.columns([0.8, 0.2])
+            with col_page:
+                if page_count > 1:
+                    st.number_input(f"페이지 (총 {page_count}쪽)", min_value=1, max_value=page_count, value=1, key="review_list_page")
             with col_button:
-                # 버튼 클릭 시 해당 노트의 ID를 세션에 저장 후 단일 복습 페이지로 이동
-                if st.button("복습 시작", key=f"start_review_{note['id']}"):
-                    st.session_state.selected_note_for_review_id = note['id']
+                # 버튼 클릭 시 선택한 노트의 ID를 세션에 저장 후 단일 복습 페이지로 이동
+                if st.button("복습 시작", key="start_review_selected", type="primary"):
+                    st.session_state.selected_note_for_review_id = selected_id
                     go_to_page('single_review')
-            st.markdown("---")
 
 # --- 단일 노트 복습 페이지 (선택된 노트만 보여줌) ---
 elif st.session_state.page == 'single_review':
     # selected_note_for_review_id를 사용하여 노트 찾기
     current_note = None
     if st.session_state.selected_note_for_review_id is not None:
-        for note in st.session_state.notes:
-            if note['id'] == st.session_state.selected_note_for_review_id:
-                current_note = note
-                break
+        current_note = st.session_state.repository.get(st.session_state.selected_note_for_review_id)
 
     if current_note is None:
         st.warning("복습할 노트가 선택되지 않았거나 찾을 수 없습니다. '오늘의 복습 목록' 또는 '내 학습 통계'에서 노트를 선택해주세요.")
@@ -269,8 +464,12 @@ elif st.session_state.page == 'single_review':
             if st.session_state[answer_key_checked]:
                 st.subheader("✅ 정답")
                 st.info(f"**{answer_content}**")
-                if st.session_state[answer_key_user].strip().lower() == answer_content.strip().lower():
+                # 공백/문장 부호/대소문자 차이는 무시하고, 짧은 오타는 정답으로 인정 (결과는 캐시되어 재실행마다 다시 계산하지 않음)
+                grade = grade_answer(st.session_state[answer_key_user], current_note)
+                if grade.exact:
                     st.success("정답입니다! 🥳")
+                elif grade.correct:
+                    st.success("정답입니다! 🥳 (작은 오타가 있어요)")
                 else:
                     st.error("아쉽지만 틀렸습니다. 다시 한번 확인해보세요. 😥")
 
@@ -298,22 +497,9 @@ elif st.session_state.page == 'single_review':
                 difficulty_chosen = True
 
         if difficulty_chosen:
-            today = datetime.now().date()
-            # 다음 복습일 계산 및 업데이트
-            next_review_date, next_interval = calculate_next_review_date(
-                today,
-                selected_difficulty,
-                current_note['current_interval']
-            )
-
-            current_note['last_reviewed_date'] = today
-            current_note['next_review_date'] = next_review_date
-            current_note['current_interval'] = next_interval
-            current_note['review_history'].append({
-                'date': today,
-                'difficulty': selected_difficulty,
-                'interval_used': next_interval
-            })
+            # 최신 노트에 평가를 적용해 저장 (다른 탭에서 먼저 평가했어도 덮어쓰지 않음)
+            reviewed = st.session_state.repository.record_reviews([(current_note['id'], selected_difficulty)], today)
+            next_review_date = reviewed[current_note['id']]['next_review_date']
 
             if selected_difficulty in ["어려웠음", "전혀 기억나지 않음"]:
                 st.warning("이 노트를 오답 노트에 추가합니다. 다음에 더 자주 복습하게 됩니다!")
@@ -338,93 +524,297 @@ elif st.session_state.page == 'single_review':
             go_to_page('review_list') # 복습 목록으로 돌아감
 
 
+# --- 연속 복습 페이지 (카드를 차례로 넘기며 복습) ---
+elif st.session_state.page == 'review_session':
+    st.title("⚡ 연속 복습")
+    if 'review_session' not in st.session_state:
+        st.warning("진행 중인 연속 복습이 없습니다. '오늘의 복습 목록'에서 연속 복습을 시작해주세요.")
+        if st.button("오늘의 복습 목록으로 돌아가기", key="session_go_review_list"):
+            go_to_page('review_list')
+    else:
+        st.write("카드를 평가하면 바로 다음 카드로 넘어갑니다. 평가 결과는 모아서 저장되며, 세션을 끝낼 때 모두 저장됩니다.")
+        st.markdown("---")
+        review_session_card()
+        st.markdown("---")
+        if st.button("세션 종료 및 저장", key="end_review_session"):
+            flush_review_session(st.session_state.review_session)
+            del st.session_state.review_session
+            go_to_page('review_list')
+
 # --- 내 학습 통계 & 모든 노트 페이지 ---
 elif st.session_state.page == 'stats':
     st.title("📊 내 학습 통계 & 모든 노트")
     st.write("등록된 노트와 복습 현황을 한눈에 확인하고, 원하는 노트를 검색하여 복습을 시작할 수 있습니다.")
 
-    st.subheader(f"🎯 나의 목표: {st.session_state.user_goal or '목표 미설정'}")
+    st.subheader(f"🎯 나의 목표: {user_goal or '목표 미설정'}")
     st.markdown("---")
     
     st.subheader("📝 나의 노트 목록")
-    if not st.session_state.notes:
+    note_count = st.session_state.repository.count()
+    if not note_count:
         st.info("아직 등록된 노트가 없습니다. '새 노트 추가'에서 새로운 지식을 등록해보세요!")
     else:
         # 검색 기능 추가
-        search_query = st.text_input("노트 제목, 태그, 카테고리 검색:", key="stats_search_bar")
-        
-        filtered_notes = [
-            note for note in st.session_state.notes
-            if search_query.lower() in note['title'].lower() or \
-               search_query.lower() in note['category'].lower() or \
-               any(search_query.lower() in tag.lower() for tag in note['tags'])
-        ] if search_query else st.session_state.notes
-
-        # 데이터프레임으로 보기 좋게 표시
-        notes_df_data = []
-        for note in filtered_notes:
-            notes_df_data.append({
-                "ID": note['id'], # ID 추가
-                "제목": note['title'],
-                "유형": note['type'],
-                "카테고리": note['category'],
-                "태그": ", ".join(note['tags']),
-                "생성일": note['created_date'].strftime('%Y-%m-%d'),
-                "마지막 복습일": note['last_reviewed_date'].strftime('%Y-%m-%d') if note['last_reviewed_date'] else "N/A",
-                "다음 복습 예정일": note['next_review_date'].strftime('%Y-%m-%d'),
-                "복습 횟수": len(note['review_history']),
-            })
+        search_query = st.text_input(
+            "노트 제목, 태그, 카테고리, 내용 검색:",
+            key="stats_search_bar",
+            on_change=lambda: st.session_state.pop("stats_search_page", None), # 검색어가 바뀌면 첫 페이지로
+        )
         
-        if notes_df_data:
-            notes_df = pd.DataFrame(notes_df_data)
-            st.dataframe(notes_df, use_container_width=True)
+        repository = st.session_state.repository # 노트 표와 검색 색인은 같은 사용자의 탭이 함께 씀
+        if search_query:
+            # n-gram 색인으로 검색하고 관련도 순으로 현재 페이지의 노트만 가져옴
+            search_page = st.session_state.get("stats_search_page", 1)
+            with stage("search_filter"):
+                result_ids, result_total = repository.search(
+                    search_query, offset=(search_page - 1) * SEARCH_PAGE_SIZE, limit=SEARCH_PAGE_SIZE
+                )
+            with stage("dataframe"):
+                notes_df = repository.note_table(result_ids)
+            st.caption(f"검색 결과 {result_total}개")
+            if result_total > SEARCH_PAGE_SIZE:
+                page_count = (result_total + SEARCH_PAGE_SIZE - 1) // SEARCH_PAGE_SIZE
+                st.number_input(f"검색 결과 페이지 (총 {page_count}쪽)", min_value=1, max_value=page_count, value=1, key="stats_search_page")
+        else:
+            # 전체 목록도 현재 페이지의 행만 문자열로 변환하여 표시
+            notes_page = st.session_state.get("stats_notes_page", 1)
+            with stage("dataframe"):
+                notes_df = repository.note_table(offset=(notes_page - 1) * NOTES_PAGE_SIZE, limit=NOTES_PAGE_SIZE)
+            if note_count > NOTES_PAGE_SIZE:
+                page_count = (note_count + NOTES_PAGE_SIZE - 1) // NOTES_PAGE_SIZE
+                st.number_input(f"노트 목록 페이지 (총 {page_count}쪽)", min_value=1, max_value=page_count, value=1, key="stats_notes_page")
+
+        if not notes_df.empty:
+            with stage("widgets"):
+                st.dataframe(notes_df, width="stretch", hide_index=True)
+        else:
+            st.info("검색 결과가 없습니다.")
 
-            st.markdown("---")
-            st.subheader("💡 특정 노트 바로 복습하기")
-            st.write("위 목록에서 복습하고 싶은 노트의 **ID**를 입력하고 '복습 시작' 버튼을 눌러주세요.")
-            
-            col_input, col_button = st.columns([0.8, 0.2])
-            with col_input:
-                # 전체 노트 개수를 기반으로 max_value 설정
-                max_note_id = len(st.session_state.notes) - 1 if st.session_state.notes else 0
-                note_id_to_review = st.number_input("복습할 노트 ID 입력:", min_value=0, max_value=max_note_id, value=0, key="id_to_review")
+        st.markdown("---")
+        st.subheader("💡 특정 노트 바로 복습하기 · 수정 · 삭제")
+        st.write("위 목록에서 노트의 **ID**를 입력하면 바로 복습하거나, 내용을 고치거나, 삭제할 수 있습니다.")
+
+        # ID는 삭제 등으로 연속이 아닐 수 있으므로 최댓값을 두지 않고 ID로 바로 조회
+        note_id_to_review = int(st.number_input("노트 ID 입력:", min_value=0, value=0, step=1, key="id_to_review"))
+        selected_note = st.session_state.repository.get(note_id_to_review)
+        if selected_note is None:
+            st.warning(f"ID {note_id_to_review}인 노트가 없습니다. (삭제되었거나 아직 만들어지지 않은 ID)")
+        else:
+            col_info, col_button = st.columns([0.8, 0.2])
+            with col_info:
+                st.write(f"**{selected_note['title']}** — {selected_note['type']} | 카테고리: {selected_note['category'] or '없음'} | 태그: {', '.join(selected_note['tags']) or '없음'}")
             with col_button:
-                st.write("") # 공간 확보
-                st.write("") # 공간 확보
                 # 버튼 클릭 시 해당 노트의 ID를 세션에 저장 후 단일 복습 페이지로 이동
                 if st.button("선택한 노트 복습 시작", key="start_selected_note_review"):
-                    st.session_state.selected_note_for_review_id = int(note_id_to_review)
+                    st.session_state.selected_note_for_review_id = note_id_to_review
                     go_to_page('single_review')
-        else:
-            st.info("검색 결과가 없습니다.")
+
+            with st.expander("✏️ 노트 수정"):
+                with st.form(f"edit_note_form_{note_id_to_review}"):
+                    edit_title = st.text_input("노트 제목", value=selected_note['title'])
+                    edit_tags = st.text_input("태그 (쉼표로 구분)", value=", ".join(selected_note['tags']))
+                    edit_category = st.text_input("카테고리", value=selected_note['category'])
+                    if selected_note['type'] == QA_NOTE_TYPE:
+                        edit_content = {
+                            "question": st.text_area("질문 (앞면)", value=selected_note['content'].get('question', "")),
+                            "answer": st.text_area("답변 (뒷면)", value=selected_note['content'].get('answer', "")),
+                        }
+                    else:
+                        edit_content = {
+                            "front": st.text_area("앞면 (단어/개념)", value=selected_note['content'].get('front', "")),
+                            "back": st.text_area("뒷면 (의미/설명)", value=selected_note['content'].get('back', "")),
+                        }
+                    if st.form_submit_button("수정 내용 저장"):
+                        try:
+                            # 복습 일정과 이력은 유지하고, 검색 색인·노트 표도 함께 갱신됨
+                            st.session_state.repository.edit(
+                                note_id_to_review, title=edit_title or selected_note['title'], tags=edit_tags,
+                                category=edit_category, content=edit_content,
+                            )
+                        except ValueError as e:
+                            st.error(str(e))
+                        except ConflictError:
+                            st.error("다른 곳에서 이 노트를 먼저 고쳤습니다. 최신 내용을 확인한 뒤 다시 수정해주세요.")
+                        else:
+                            st.success("노트를 수정했습니다.")
+                            st.rerun()
+
+            with st.expander("🗑️ 노트 삭제"):
+                st.write("노트와 복습 이력이 함께 삭제되며 되돌릴 수 없습니다. 삭제한 노트의 ID는 다시 사용되지 않습니다.")
+                confirm_delete = st.checkbox("이 노트를 삭제합니다.", key=f"confirm_delete_{note_id_to_review}")
+                if st.button("노트 삭제", key=f"delete_note_{note_id_to_review}", disabled=not confirm_delete):
+                    st.session_state.repository.delete(note_id_to_review)
+                    st.success("노트를 삭제했습니다.")
+                    st.rerun()
 
 
         st.markdown("---")
         st.subheader("오답 노트 (어려웠던 지식)")
-        # '어려웠음' 또는 '전혀 기억나지 않음'으로 평가된 이력이 있는 노트 목록
-        difficult_notes = []
-        for note in st.session_state.notes:
-            if note['review_history'] and note['review_history'][-1]['difficulty'] in ["어려웠음", "전혀 기억나지 않음"]:
-                    difficult_notes.append({
-                        "제목": note['title'],
-                        "유형": note['type'],
-                        "마지막 난이도": note['review_history'][-1]['difficulty'],
-                        "마지막 평가일": note['review_history'][-1]['date'].strftime('%Y-%m-%d'),
-                        "다음 복습 예정일": note['next_review_date'].strftime('%Y-%m-%d')
-                    })
-        
-        if difficult_notes:
-            difficult_df = pd.DataFrame(difficult_notes)
-            st.dataframe(difficult_df, use_container_width=True)
+        # 마지막 평가가 '어려웠음' 또는 '전혀 기억나지 않음'인 노트 목록 (캐시된 DataFrame에서 필터링하고 현재 페이지만 변환)
+        difficult_page = st.session_state.get("stats_difficult_page", 1)
+        with stage("dataframe"):
+            difficult_df, difficult_total = repository.difficult_table(
+                offset=(difficult_page - 1) * DIFFICULT_PAGE_SIZE, limit=DIFFICULT_PAGE_SIZE
+            )
+        page_count = max(1, (difficult_total + DIFFICULT_PAGE_SIZE - 1) // DIFFICULT_PAGE_SIZE)
+        if difficult_page > page_count:
+            # 복습으로 오답 노트가 줄어 현재 페이지가 사라졌으면 마지막 페이지로
+            st.session_state["stats_difficult_page"] = difficult_page = page_count
+            with stage("dataframe"):
+                difficult_df, difficult_total = repository.difficult_table(
+                    offset=(difficult_page - 1) * DIFFICULT_PAGE_SIZE, limit=DIFFICULT_PAGE_SIZE
+                )
+        if difficult_total > DIFFICULT_PAGE_SIZE:
+            st.number_input(f"오답 노트 페이지 (총 {page_count}쪽)", min_value=1, max_value=page_count, key="stats_difficult_page")
+        if not difficult_df.empty:
+            with stage("widgets"):
+                st.dataframe(difficult_df, width="stretch", hide_index=True)
         else:
             st.info("아직 어려운 노트가 없네요! 잘하고 계십니다! 👍")
 
+        st.markdown("---")
+        st.subheader("📈 복습량 예측")
+        st.write("현재 복습 일정과 지금까지의 난이도 평가를 바탕으로 앞으로의 일별 복습량을 예측합니다.")
+        forecast_horizon = st.selectbox("예측 기간", FORECAST_HORIZONS, format_func=lambda days: f"{days}일", key="forecast_horizon")
+        if st.toggle("복습량 예측 보기", key="show_forecast"):
+            store = st.session_state.repository.store
+            # 간격 배수를 맞춰 두었으면 사용자 전체 배수로 예측 (카테고리별 차이는 반영하지 않음)
+            growth_factors = growth_factors_for(st.session_state.repository.interval_params)
+            forecast = load_review_forecast(store, store.path, store.user_id, store.revision(), today, forecast_horizon, growth_factors)
+            with stage("dataframe"):
+                forecast_df = pd.DataFrame(
+                    {"평균 복습량": forecast['mean'], "상위 10% 복습량": forecast['p90']},
+                    index=pd.date_range(today, periods=forecast_horizon, name="날짜"),
+                )
+            with stage("widgets"):
+                st.line_chart(forecast_df)
+            peak_day = int(forecast['p90'].argmax())
+            st.caption(f"복습이 가장 몰릴 것으로 예상되는 날: **{(today + timedelta(days=peak_day)).strftime('%Y-%m-%d')}** (최대 약 {forecast['p90'][peak_day]:.0f}개)")
+
+        st.markdown("---")
+        st.subheader("⚙️ 복습 간격 최적화")
+        st.write("지금까지의 복습 기록으로 난이도별 간격 배수를 다시 맞춥니다. 목표 기억률을 지키는 가장 긴 간격을 골라 복습량을 줄입니다.")
+        interval_params = repository.interval_params
+        if interval_params:
+            st.caption(f"{interval_params['fitted_on']}에 복습 쌍 {interval_params['pairs']:,}개로 맞춘 배수를 사용 중 (목표 기억률 {interval_params['target_recall']:.0%})")
+        else:
+            st.caption("기본 배수를 사용 중입니다.")
+        target_recall = st.slider(
+            "목표 기억률", *TARGET_RECALL_RANGE, value=DEFAULT_TARGET_RECALL, step=0.01, format="%.2f", key="optimizer_target_recall",
+        )
+        col_fit, col_reset = st.columns(2)
+        with col_fit:
+            if st.button("복습 기록으로 간격 맞추기", key="optimizer_fit"):
+                with st.spinner("복습 기록을 분석하는 중..."):
+                    repository.set_interval_params(optimize_intervals(repository.store, target_recall=target_recall))
+                st.rerun()
+        with col_reset:
+            if st.button("기본 배수로 되돌리기", key="optimizer_reset", disabled=not interval_params):
+                repository.set_interval_params(None)
+                st.rerun()
+        if interval_params:
+            fitted = interval_params['default']
+            st.dataframe(
+                pd.DataFrame({
+                    "난이도": DIFFICULTIES[:FORGOT_CODE],
+                    "기본 배수": GROWTH_FACTORS[:FORGOT_CODE],
+                    "맞춘 배수": [round(m, 2) for m in fitted['multipliers']],
+                    "기본 배수의 예상 기억률": [
+                        None if decay is None else f"{expected_recall(decay, default):.0%}"
+                        for decay, default in zip(fitted['decays'], GROWTH_FACTORS)
+                    ],
+                    "복습 쌍": fitted['pairs'],
+                }),
+                hide_index=True,
+            )
+            if interval_params['categories']:
+                st.caption("카테고리별로 따로 맞춘 배수: " + ", ".join(
+                    f"{name or '카테고리 없음'} ({' / '.join(f'{m:.2f}' for m in values['multipliers'])})"
+                    for name, values in interval_params['categories'].items()
+                ))
+
         st.markdown("---")
         st.subheader("💡 팁: 복습 스케줄")
         st.write("각 노트의 다음 복습 예정일은 당신의 기억 난이도 평가에 따라 자동으로 조절됩니다.")
         st.write("자주 틀리는 내용은 더 짧은 주기로, 쉽게 기억하는 내용은 더 긴 주기로 복습하게 됩니다.")
 
 
+# --- 노트 일괄 가져오기/내보내기 페이지 ---
+elif st.session_state.page == 'bulk':
+    st.title("📦 노트 일괄 가져오기/내보내기")
+    st.write("많은 노트를 파일로 한 번에 추가하거나, 모든 노트와 복습 이력을 파일로 저장할 수 있습니다.")
+
+    st.subheader("📥 가져오기")
+    st.write("CSV/JSONL 파일은 `question`·`answer` 또는 `front`·`back` 컬럼(키)이 필요하고, `title`, `tags`, `category`는 선택 사항입니다.")
+    st.write("Anki TSV 파일은 `앞면<탭>뒷면<탭>태그` 형식의 외우기(플래시카드) 노트로 가져옵니다.")
+    uploaded_file = st.file_uploader("가져올 파일", type=["csv", "jsonl", "tsv", "txt"], key="bulk_import_file")
+    if uploaded_file is not None:
+        import_format = st.selectbox(
+            "파일 형식",
+            list(IMPORT_FORMATS),
+            index=list(IMPORT_FORMATS).index(guess_format(uploaded_file.name)),
+            format_func=IMPORT_FORMATS.get,
+            key="bulk_import_format",
+        )
+        if st.button("가져오기 시작", key="bulk_import_start"):
+            progress_bar = st.progress(0.0, text="노트를 가져오는 중...")
+            result = import_notes(
+                uploaded_file,
+                import_format,
+                today,
+                st.session_state.repository.save_many,
+                st.session_state.repository.allocate_ids, # 새 노트 추가와 같은 ID 발급기 사용
+                progress=lambda done, ratio: progress_bar.progress(ratio, text=f"{done}개 가져옴"),
+            )
+            st.success(f"{result.imported}개의 노트를 가져왔습니다! 첫 복습은 내일부터 시작됩니다. 🎉")
+            if result.error_count:
+                st.warning(f"{result.error_count}개의 줄은 형식이 맞지 않아 건너뛰었습니다.")
+                st.dataframe(pd.DataFrame(result.errors, columns=["줄 번호", "오류"]), width="stretch", hide_index=True)
 
+    st.markdown("---")
+    st.subheader("📝 답안지 채점")
+    st.write("CSV/JSONL 답안지의 각 줄에 노트 `id`와 `answer`를 적어 올리면 주관식 채점 규칙으로 한 번에 채점합니다.")
+    answer_sheet = st.file_uploader("답안지 파일", type=list(ANSWER_SHEET_FORMATS), key="bulk_answer_sheet")
+    if answer_sheet is not None and st.button("채점하기", key="bulk_grade_start"):
+        # 노트는 한 번에 가져오고, 정답 키는 저장할 때 만들어 둔 값을 사용
+        result = grade_answer_sheet(answer_sheet, guess_format(answer_sheet.name), st.session_state.repository.get_many)
+        graded = [row for row in result.graded if row[3] is not None]
+        if graded:
+            correct = sum(grade.correct for _, _, _, grade in graded)
+            st.success(f"{len(graded)}개 중 {correct}개 정답 ({correct / len(graded):.0%})")
+            st.dataframe(
+                pd.DataFrame(
+                    [
+                        (line_no, note_id, response, "정답" if grade.exact else "정답 (오타)" if grade.correct else "오답")
+                        for line_no, note_id, response, grade in graded
+                    ],
+                    columns=["줄 번호", "노트 ID", "답안", "결과"],
+                ),
+                width="stretch",
+                hide_index=True,
+            )
+        missing = len(result.graded) - len(graded)
+        if missing:
+            st.warning(f"{missing}개의 답안은 노트를 찾을 수 없어 채점하지 않았습니다.")
+        if result.error_count:
+            st.warning(f"{result.error_count}개의 줄은 형식이 맞지 않아 건너뛰었습니다.")
+            st.dataframe(pd.DataFrame(result.errors, columns=["줄 번호", "오류"]), width="stretch", hide_index=True)
 
-
+    st.markdown("---")
+    st.subheader("📤 내보내기")
+    export_format = st.selectbox("내보낼 형식", list(EXPORT_FORMATS), format_func=EXPORT_FORMATS.get, key="bulk_export_format")
+    st.caption("CSV와 JSONL에는 복습 이력이 함께 저장되고, Anki TSV에는 앞면/뒷면/태그만 저장됩니다.")
+    store = st.session_state.repository.store
+    st.download_button(
+        "내보내기 파일 다운로드",
+        # 버튼을 누를 때만 파일을 만들고, 노트는 저장소에서 조금씩 읽어 씀
+        data=lambda: export_notes_bytes(store, export_format),
+        file_name=f"notes.{export_format}",
+        key="bulk_export_download",
+    )
+
+# --- 성능 측정 마무리 (사이드바 디버그 패널) ---
+if profiling_enabled:
+    st.session_state.profiler.finish_rerun()
+    with st.sidebar:
+        render_profiling_panel(st.session_state.profiler)
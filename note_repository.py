@@ -0,0 +1,289 @@
+import threading
+from collections import OrderedDict
+
+from due_snapshot import DueSnapshot
+from note_store import ConflictError
+from notes import apply_review, build_note, is_content_empty, parse_tags, validate_note
+from notes_frame import NotesFrame
+from review_log import ReviewLog
+from search_index import SearchIndex
+
+# ID -> 노트 캐시에 보관할 최대 노트 수 (오래 쓰지 않은 노트부터 내보냄)
+NOTE_CACHE_SIZE = 10_000
+
+# 다른 세션과 동시에 평가해 충돌했을 때 최신 노트로 다시 시도하는 횟수
+REVIEW_SAVE_ATTEMPTS = 3
+
+# 노트 수정 화면에서 바꿀 수 있는 필드 (유형을 바꾸면 내용 필드가 달라지므로 제외)
+EDITABLE_FIELDS = ("title", "tags", "category", "content")
+
+
+def copy_note(note):
+    """호출한 쪽에서 노트를 고쳐도 캐시가 바뀌지 않도록, 변경 가능한 필드까지 복사합니다."""
+    return {
+        **note,
+        "tags": list(note["tags"]),
+        "content": dict(note["content"]),
+        "difficulty_counts": list(note["difficulty_counts"]),
+    }
+
+
+# --- 노트 저장소 + 세션 색인 ---
+class NoteRepository:
+    """
+    페이지 코드가 노트를 읽고 쓰는 유일한 입구입니다.
+    저장소(NoteStore)에 기록하면서 ID -> 노트 캐시, 오늘의 복습 스냅샷, 검색 색인, 노트 표를 함께 갱신하므로
+    추가/수정/삭제 후에도 모든 색인이 같은 상태를 유지합니다.
+    ID는 저장소의 단조 증가 카운터로 발급하므로 노트를 삭제해도 겹치지 않고,
+    카테고리/태그/유형별 조회는 저장소 인덱스를 사용해 결과 수에만 비례합니다.
+
+    한 사용자의 저장소 하나를 여러 탭(스레드)이 함께 쓰도록 만들어졌으므로, 메모리 안의 색인은 잠금으로 보호합니다.
+    다른 프로세스가 같은 사용자의 노트를 고친 것은 저장소 수정 번호로 알아채고 색인을 다시 만듭니다.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.RLock()
+        # 오늘 복습할 노트와 카테고리별 개수 (하루에 한 번 만들고 이후에는 증분 갱신)
+        self.due_snapshot = DueSnapshot(store)
+        self.due_snapshot.start_midnight_refresh()
+        self.today = None
+        self._reset()
+
+    def _reset(self):
+        """저장소에서 색인을 다시 읽어오도록 메모리 안의 상태를 비웁니다."""
+        self._revision = self.store.revision()
+        # 복습 기록으로 맞춘 간격 배수 (없으면 None -> 기본 배수)
+        self.interval_params = self.store.get_interval_params()
+        self.due_snapshot.day = None  # 다음 begin_day에서 다시 만듦
+        self._cache = OrderedDict()  # note_id -> 노트 (LRU)
+        self._search_index = None
+        self._notes_frame = None
+
+    def _track_revision(self, revision):
+        # 우리 쓰기로 정확히 1 증가했을 때만 따라감 (그 사이 다른 프로세스가 썼다면 begin_day에서 다시 읽음)
+        if revision is not None and revision == self._revision + 1:
+            self._revision = revision
+
+    def __len__(self):
+        return self.store.count()
+
+    def __contains__(self, note_id):
+        return self.get(note_id) is not None
+
+    def count(self):
+        return self.store.count()
+
+    def begin_day(self, today):
+        """
+        재실행마다 한 번 호출해 '오늘'을 정합니다. 날짜가 바뀌었으면 복습 스냅샷을 새로 만들고,
+        다른 프로세스(명령줄 가져오기 등)가 노트를 고쳤으면 색인을 다시 읽습니다.
+        """
+        with self._lock:
+            if self.store.revision() != self._revision:
+                self._reset()
+            self.today = self.due_snapshot.ensure_day(today)
+            return self.today
+
+    def revision(self):
+        return self._revision
+
+    # --- 사용자 설정 ---
+    def goal(self):
+        return self.store.get_goal()
+
+    def set_goal(self, goal):
+        self.store.set_goal(goal)
+
+    def set_interval_params(self, params):
+        """간격 배수를 저장하고 이후 평가부터 적용합니다. (None이면 기본 배수로 되돌림)"""
+        with self._lock:
+            self._track_revision(self.store.set_interval_params(params))
+            self.interval_params = params
+
+    # --- 필요할 때 한 번만 만드는 세션 색인 ---
+    @property
+    def search_index(self):
+        """검색 색인은 처음 검색할 때 한 번만 만들고, 이후에는 저장/삭제 때 증분 갱신합니다."""
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex(self.store.iter_notes())
+            return self._search_index
+
+    @property
+    def notes_frame(self):
+        """통계 페이지의 노트 DataFrame은 처음 열 때 한 번만 만들고, 이후에는 저장/삭제 때 행 단위로 갱신합니다."""
+        with self._lock:
+            if self._notes_frame is None:
+                self._notes_frame = NotesFrame(self.store.iter_notes())
+            return self._notes_frame
+
+    def search(self, query, offset=0, limit=None):
+        with self._lock:
+            return self.search_index.search(query, offset=offset, limit=limit)
+
+    def note_table(self, note_ids=None, offset=0, limit=None):
+        with self._lock:
+            return self.notes_frame.note_table(note_ids, offset=offset, limit=limit)
+
+    def difficult_table(self, offset=0, limit=None):
+        with self._lock:
+            return self.notes_frame.difficult_table(offset=offset, limit=limit)
+
+    def upcoming(self, n):
+        """가장 가까운 복습 예정 (note_id, 날짜) n개"""
+        return self.store.upcoming(n)
+
+    # --- ID -> 노트 캐시 ---
+    def _remember(self, note):
+        self._cache[note["id"]] = copy_note(note)
+        self._cache.move_to_end(note["id"])
+        if len(self._cache) > NOTE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def get(self, note_id):
+        """ID로 노트를 찾습니다. 캐시에 있으면 O(1), 없으면 기본 키 조회 한 번. 없는 ID는 None."""
+        with self._lock:
+            note = self._cache.get(note_id)
+            if note is None:
+                note = self.store.get(note_id)
+                if note is None:
+                    return None
+                self._remember(note)
+            else:
+                self._cache.move_to_end(note_id)
+            return copy_note(note)
+
+    def get_many(self, note_ids):
+        """요청한 순서대로 노트를 반환합니다. 캐시에 없는 노트만 저장소에서 한 번에 읽어옵니다. (없는 ID는 건너뜀)"""
+        note_ids = list(note_ids)
+        with self._lock:
+            missing = [note_id for note_id in note_ids if note_id not in self._cache]
+            found = {note['id']: note for note in self.store.get_many(missing)}
+            for note in found.values():
+                self._remember(note)
+            # 캐시 크기보다 많이 요청하면 앞쪽 노트가 캐시에서 밀려날 수 있으므로 방금 읽은 노트도 함께 찾음
+            notes = (self._cache.get(note_id) or found.get(note_id) for note_id in note_ids)
+            return [copy_note(note) for note in notes if note is not None]
+
+    def forget(self, note_ids):
+        """캐시에서 노트를 지워 다음 조회 때 저장소에서 최신 값을 읽게 합니다. (저장 충돌 후)"""
+        with self._lock:
+            for note_id in note_ids:
+                self._cache.pop(note_id, None)
+
+    # --- 카테고리/태그/유형 색인 ---
+    def categories(self):
+        return self.store.categories()
+
+    def tags(self):
+        return self.store.tags()
+
+    def filter_ids(self, category=None, tag=None, note_type=None):
+        """
+        주어진 카테고리/태그/유형을 모두 만족하는 노트 ID 집합. 조건이 하나도 없으면 None(전체)을 반환합니다.
+        각 조건은 저장소 인덱스로 찾으므로 전체 노트 수가 아니라 해당 노트 수에 비례합니다.
+        """
+        facets = [
+            (self.store.ids_by_category, category),
+            (self.store.ids_by_tag, tag),
+            (self.store.ids_by_type, note_type),
+        ]
+        result = None
+        for lookup, value in facets:
+            if value is None:
+                continue
+            ids = set(lookup(value))
+            result = ids if result is None else result & ids
+        return result
+
+    # --- 쓰기 ---
+    def allocate_ids(self, count=1):
+        return self.store.allocate_ids(count)
+
+    def create(self, note_type, title, tags, category, content, today):
+        """새 ID를 발급해 노트를 만들고 저장합니다."""
+        note = build_note(self.allocate_ids(1)[0], note_type, title, tags, category, content, today)
+        self.save(note)
+        return note
+
+    def save_many(self, notes, events=None):
+        """
+        노트(와 복습 이벤트)를 저장소에 기록하고, 캐시·복습 스냅샷·검색 색인·노트 표를 함께 갱신합니다.
+        다른 곳에서 먼저 고친 노트가 있으면 ConflictError (해당 노트는 캐시에서 지워 다음 조회 때 최신 값을 읽음)
+        형식이 잘못된 노트가 하나라도 있으면 아무것도 저장하거나 색인하지 않고 ValueError
+        """
+        notes = list(notes)
+        for note in notes:
+            validate_note(note)
+        with self._lock:
+            try:
+                revision = self.store.upsert_many(notes, events)  # 변경된 노트만 저장
+            except ConflictError as e:
+                self.forget(e.note_ids)
+                raise
+            self._track_revision(revision)
+            for note in notes:
+                self._remember(note)
+                self.due_snapshot.update(note)
+                if self._search_index is not None:
+                    self._search_index.update(note)
+                if self._notes_frame is not None:
+                    self._notes_frame.upsert(note)
+
+    def save(self, note, events=None):
+        self.save_many([note], events)
+
+    def record_reviews(self, grades, today, attempts=REVIEW_SAVE_ATTEMPTS):
+        """
+        (note_id, 난이도) 평가 목록을 최신 노트에 차례로 반영하고 한 트랜잭션으로 저장합니다. 반환값: note_id -> 저장된 노트
+        다른 탭/사용자가 같은 노트를 먼저 평가해 충돌하면, 최신 노트를 다시 읽어 평가를 다시 적용하므로 어느 평가도 사라지지 않습니다.
+        """
+        grades = list(grades)
+        for attempt in range(attempts):
+            notes = {note['id']: note for note in self.get_many(dict.fromkeys(note_id for note_id, _ in grades))}
+            events = ReviewLog()
+            for note_id, difficulty in grades:
+                if note_id in notes:  # 그 사이 삭제된 노트는 건너뜀
+                    apply_review(notes[note_id], difficulty, today, events, self.interval_params)
+            try:
+                self.save_many(notes.values(), events)
+                return notes
+            except ConflictError:
+                if attempt == attempts - 1:
+                    raise
+
+    def edit(self, note_id, **changes):
+        """
+        노트의 제목/태그/카테고리/내용을 수정합니다. 복습 일정과 이력은 그대로 유지합니다.
+        없는 노트는 KeyError, 내용이 비면 ValueError.
+        """
+        unknown = set(changes) - set(EDITABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"수정할 수 없는 필드입니다: {', '.join(sorted(unknown))}")
+        note = self.get(note_id)
+        if note is None:
+            raise KeyError(note_id)
+        note.update(changes)
+        note["tags"] = parse_tags(note["tags"])
+        note["category"] = note["category"] or ""
+        if is_content_empty(note["type"], note["content"]):
+            raise ValueError("질문/앞면과 답변/뒷면 내용을 모두 입력해야 합니다.")
+        self.save(note)
+        return note
+
+    def delete_many(self, note_ids):
+        """노트와 복습 이력을 삭제하고 모든 색인에서 뺍니다. 삭제된 ID는 다시 발급하지 않습니다."""
+        note_ids = list(note_ids)
+        with self._lock:
+            self._track_revision(self.store.delete_many(note_ids))
+            for note_id in note_ids:
+                self._cache.pop(note_id, None)
+                self.due_snapshot.remove(note_id)
+                if self._search_index is not None:
+                    self._search_index.remove(note_id)
+                if self._notes_frame is not None:
+                    self._notes_frame.remove(note_id)
+
+    def delete(self, note_id):
+        self.delete_many([note_id])
@@ -0,0 +1,663 @@
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import date
+
+from grading import answer_key, note_answer
+from review_log import LAPSE_CODES, ReviewLog
+from scheduler import DIFFICULTIES
+
+# 기본 데이터베이스 경로 (환경 변수로 변경 가능)
+DEFAULT_DB_PATH = os.environ.get("REVIEW_DB_PATH", "notes.db")
+
+# 사용자를 지정하지 않았을 때의 사용자
+DEFAULT_USER = "default"
+# 사용자 이름 규칙: 글자(한글 포함), 숫자, '_', '-', '.' 로 이루어진 1~32자
+USER_ID_PATTERN = re.compile(r"[\w.-]{1,32}")
+
+# 연결 풀 크기와 다른 연결이 쓰는 중일 때 기다리는 시간(초)
+POOL_SIZE = int(os.environ.get("REVIEW_DB_POOL_SIZE", "8"))
+BUSY_TIMEOUT = 10.0
+
+# 가벼운 컬럼만 읽는 조회를 나누어 가져오는 단위 (한 묶음을 읽는 동안만 연결을 빌림)
+FETCH_BATCH_SIZE = 5000
+
+# 날짜 필드 (저장 시 ISO 문자열로 변환, 읽을 때 date로 복원)
+DATE_FIELDS = ("created_date", "last_reviewed_date", "next_review_date")
+
+# 난이도별 평가 횟수 컬럼 (scheduler.DIFFICULTIES 순서)
+COUNT_COLUMNS = ("easy_count", "normal_count", "hard_count", "forgot_count")
+
+
+def _to_iso(value):
+    return value.isoformat() if value else None
+
+
+def _from_iso(value):
+    return date.fromisoformat(value) if value else None
+
+
+def is_valid_user_id(user_id):
+    return isinstance(user_id, str) and USER_ID_PATTERN.fullmatch(user_id) is not None
+
+
+class ConflictError(Exception):
+    """다른 세션이 먼저 수정한 노트를 이전 버전 기준으로 저장하려 할 때 발생합니다. (낙관적 동시성 제어)"""
+
+    def __init__(self, note_ids):
+        self.note_ids = list(note_ids)
+        super().__init__(f"다른 곳에서 먼저 수정된 노트가 있습니다: {self.note_ids}")
+
+
+class PoolTimeoutError(Exception):
+    """BUSY_TIMEOUT 동안 연결 풀에서 쉬는 연결을 얻지 못했을 때 발생합니다."""
+
+    def __init__(self, size, timeout):
+        super().__init__(
+            f"데이터베이스 연결 {size}개가 모두 사용 중이라 {timeout:g}초 안에 연결을 얻지 못했습니다. "
+            "잠시 후 다시 시도하거나 REVIEW_DB_POOL_SIZE를 늘려 주세요."
+        )
+
+
+# --- 저장소 인터페이스 ---
+class NoteStore(ABC):
+    """
+    노트 저장소의 공통 인터페이스입니다.
+    백엔드(SQLite, 로그 파일 등)를 교체할 수 있도록 페이지 코드는 이 메서드들만 사용합니다.
+    저장소 하나는 한 사용자의 노트만 보고 씁니다.
+    """
+
+    user_id = DEFAULT_USER
+
+    def upsert(self, note, events=None):
+        return self.upsert_many([note], events)
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        return self.count()
+
+    @abstractmethod
+    def get(self, note_id):
+        """ID의 노트 (없으면 None)"""
+
+    @abstractmethod
+    def get_many(self, note_ids):
+        """여러 노트를 한 번에 가져옵니다. (없는 ID는 건너뜀)"""
+
+    @abstractmethod
+    def upsert_many(self, notes, events=None):
+        """노트와 복습 이벤트(ReviewLog)를 한 트랜잭션으로 저장합니다. 반환값: 새 수정 번호"""
+
+    @abstractmethod
+    def delete_many(self, note_ids):
+        """노트와 그 복습 이벤트/태그를 지웁니다."""
+
+    @abstractmethod
+    def allocate_ids(self, count=1):
+        """겹치지 않는 새 노트 ID count개"""
+
+    @abstractmethod
+    def review_log(self, note_id=None):
+        """복습 이벤트를 ReviewLog로 (note_id가 없으면 전체)"""
+
+    @abstractmethod
+    def iter_review_events(self, batch_size=500):
+        """복습 이벤트를 노트 ID 순으로 하나씩"""
+
+    @abstractmethod
+    def count(self):
+        """노트 수"""
+
+    @abstractmethod
+    def upcoming(self, limit):
+        """가장 빨리 복습할 노트 limit개의 (id, next_review_date)"""
+
+    @abstractmethod
+    def due_entries(self, today):
+        """today까지 복습할 노트의 (id, category, next_review_date)"""
+
+    @abstractmethod
+    def iter_notes(self, batch_size=1000):
+        """모든 노트를 ID 순으로 하나씩"""
+
+    @abstractmethod
+    def iter_schedule_state(self):
+        """노트마다 (next_review_date, current_interval, 난이도별 평가 횟수)"""
+
+    @abstractmethod
+    def revision(self):
+        """저장할 때마다 늘어나는 수정 번호 (캐시 키)"""
+
+    @abstractmethod
+    def ids_by_category(self, category):
+        ...
+
+    @abstractmethod
+    def ids_by_tag(self, tag):
+        ...
+
+    @abstractmethod
+    def ids_by_type(self, note_type):
+        ...
+
+    @abstractmethod
+    def categories(self):
+        """비어 있지 않은 카테고리 목록"""
+
+    @abstractmethod
+    def tags(self):
+        """태그 목록"""
+
+    @abstractmethod
+    def get_goal(self):
+        ...
+
+    @abstractmethod
+    def set_goal(self, goal):
+        ...
+
+    @abstractmethod
+    def get_interval_params(self):
+        """맞춘 간격 배수 (interval_optimizer.fit_interval_params 결과, 없으면 None)"""
+
+    @abstractmethod
+    def set_interval_params(self, params):
+        ...
+
+    @abstractmethod
+    def note_categories(self):
+        """노트마다 (id, category)"""
+
+
+# --- SQLite 연결 풀 ---
+class ConnectionPool:
+    """
+    SQLite(WAL) 연결 풀. 여러 세션(스레드)이 연결을 빌려 쓰고 돌려놓으므로 열린 탭 수와 관계없이 연결은 size개까지만 만듭니다.
+    같은 스레드에서 다시 빌리면 이미 빌린 연결을 그대로 쓰므로, 한 트랜잭션이 다른 스레드의 문장과 섞이지 않습니다.
+    WAL 모드라 읽기는 여러 연결에서 동시에 진행되고, 쓰기는 SQLite가 한 번에 하나씩 처리합니다.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, size=POOL_SIZE):
+        self.path = path
+        self._size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self):
+        # Streamlit은 재실행마다 다른 스레드에서 스크립트를 실행할 수 있음
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=BUSY_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self._size:
+                self._created += 1
+                return self._connect()
+        try:
+            return self._idle.get(timeout=BUSY_TIMEOUT)
+        except queue.Empty:
+            raise PoolTimeoutError(self._size, BUSY_TIMEOUT) from None
+
+    @contextmanager
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:  # 같은 스레드 안에서 중첩 사용
+            yield conn
+            return
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# --- SQLite(WAL) 저장소 ---
+class SQLiteNoteStore(NoteStore):
+    """
+    SQLite WAL 모드 기반 노트 저장소.
+    여러 사용자가 한 데이터베이스를 함께 쓰며, 모든 조회와 쓰기는 user_id로 구분합니다.
+    (user_id, next_review_date/category/type) 인덱스와 태그 테이블을 두고, 변경은 노트 단위 upsert로 기록합니다.
+    노트마다 version을 두어 다른 세션이 먼저 저장한 노트를 덮어쓰지 않습니다.
+    노트는 필요한 만큼만 조회하므로 시작 비용이 전체 노트 수에 비례하지 않습니다.
+    """
+
+    _COLUMNS = (
+        "id", "type", "title", "tags", "category", "content",
+        "created_date", "last_reviewed_date", "next_review_date",
+        "current_interval", "initial_review_mode",
+        *COUNT_COLUMNS, "streak", "last_difficulty", "answer_key",
+    )
+
+    def __init__(self, path=DEFAULT_DB_PATH, user_id=DEFAULT_USER, pool=None):
+        if not is_valid_user_id(user_id):
+            raise ValueError(f"올바르지 않은 사용자 이름입니다: {user_id!r}")
+        self.path = path
+        self.user_id = user_id
+        self._owns_pool = pool is None
+        self._pool = pool or ConnectionPool(path)
+        with self._pool.connection() as conn, conn:
+            self._create_schema(conn)
+            conn.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (user_id,))
+
+    def _create_schema(self, conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS notes (
+                id INTEGER PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
+                type TEXT NOT NULL,
+                title TEXT NOT NULL,
+                tags TEXT NOT NULL,
+                category TEXT NOT NULL DEFAULT '',
+                content TEXT NOT NULL,
+                created_date TEXT NOT NULL,
+                last_reviewed_date TEXT,
+                next_review_date TEXT,
+                current_interval INTEGER NOT NULL,
+                initial_review_mode TEXT NOT NULL,
+                easy_count INTEGER NOT NULL DEFAULT 0,
+                normal_count INTEGER NOT NULL DEFAULT 0,
+                hard_count INTEGER NOT NULL DEFAULT 0,
+                forgot_count INTEGER NOT NULL DEFAULT 0,
+                streak INTEGER NOT NULL DEFAULT 0,
+                last_difficulty INTEGER,
+                answer_key TEXT NOT NULL DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS idx_notes_user ON notes(user_id);
+            CREATE INDEX IF NOT EXISTS idx_notes_user_next_review ON notes(user_id, next_review_date);
+            CREATE INDEX IF NOT EXISTS idx_notes_user_category ON notes(user_id, category);
+            CREATE INDEX IF NOT EXISTS idx_notes_user_type ON notes(user_id, type);
+            CREATE TABLE IF NOT EXISTS review_events (
+                note_id INTEGER NOT NULL,
+                day INTEGER NOT NULL,
+                difficulty INTEGER NOT NULL,
+                interval_used INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_review_events_note ON review_events(note_id);
+            CREATE TABLE IF NOT EXISTS note_tags (
+                tag TEXT NOT NULL,
+                note_id INTEGER NOT NULL,
+                PRIMARY KEY (tag, note_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_note_tags_note ON note_tags(note_id);
+            CREATE TABLE IF NOT EXISTS users (
+                user_id TEXT PRIMARY KEY,
+                goal TEXT NOT NULL DEFAULT '',
+                revision INTEGER NOT NULL DEFAULT 0,
+                interval_params TEXT
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('next_id', 0);
+        """)
+
+    # --- 행 <-> 노트 딕셔너리 변환 ---
+    def _row_to_note(self, row):
+        note = dict(row)
+        del note["user_id"]
+        note["tags"] = json.loads(note["tags"])
+        note["content"] = json.loads(note["content"])
+        for field in DATE_FIELDS:
+            note[field] = _from_iso(note[field])
+        counts = [note.pop(column) for column in COUNT_COLUMNS]
+        last_difficulty = note.pop("last_difficulty")
+        note.update(
+            review_count=sum(counts),
+            lapse_count=sum(counts[code] for code in LAPSE_CODES),
+            streak=note.pop("streak"),
+            last_difficulty=DIFFICULTIES[last_difficulty] if last_difficulty is not None else None,
+            difficulty_counts=counts,
+        )
+        return note
+
+    def _review_stats_values(self, note):
+        last_difficulty = note["last_difficulty"]
+        return (
+            *note["difficulty_counts"],
+            note["streak"],
+            DIFFICULTIES.index(last_difficulty) if last_difficulty is not None else None,
+        )
+
+    def _note_values(self, note):
+        """_COLUMNS 중 id를 뺀 컬럼 값"""
+        return (
+            note["type"],
+            note["title"],
+            json.dumps(note["tags"], ensure_ascii=False),
+            note["category"] or "",
+            json.dumps(note["content"], ensure_ascii=False),
+            _to_iso(note["created_date"]),
+            _to_iso(note["last_reviewed_date"]),
+            _to_iso(note["next_review_date"]),
+            note["current_interval"],
+            note["initial_review_mode"],
+            *self._review_stats_values(note),
+            answer_key(note_answer(note)),  # 저장할 때 정답 키를 만들어 두고 채점 때 바로 씀
+        )
+
+    # --- 조회 ---
+    def get(self, note_id):
+        with self._pool.connection() as conn:
+            row = conn.execute("SELECT * FROM notes WHERE id = ? AND user_id = ?", (note_id, self.user_id)).fetchone()
+        return self._row_to_note(row) if row else None
+
+    def get_many(self, note_ids):
+        """요청한 순서대로 노트를 반환합니다. (존재하지 않는 ID는 건너뜀)"""
+        note_ids = list(note_ids)
+        found = {}
+        with self._pool.connection() as conn:
+            # SQLite 바인딩 변수 개수 제한을 피하기 위해 나누어 조회
+            for start in range(0, len(note_ids), 500):
+                chunk = note_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for row in conn.execute(
+                    f"SELECT * FROM notes WHERE user_id = ? AND id IN ({placeholders})", (self.user_id, *chunk)
+                ):
+                    found[row["id"]] = self._row_to_note(row)
+        return [found[note_id] for note_id in note_ids if note_id in found]
+
+    def count(self):
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM notes WHERE user_id = ?", (self.user_id,)).fetchone()[0]
+
+    def upcoming(self, limit):
+        """가장 빨리 복습할 노트 limit개의 (id, next_review_date)를 반환합니다. ((user_id, next_review_date) 인덱스 사용)"""
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT id, next_review_date FROM notes WHERE user_id = ? AND next_review_date IS NOT NULL "
+                "ORDER BY next_review_date, id LIMIT ?",
+                (self.user_id, limit),
+            ).fetchall()
+        return [(note_id, _from_iso(next_review_date)) for note_id, next_review_date in rows]
+
+    def due_entries(self, today):
+        """오늘까지 복습 예정인 노트의 (id, category, next_review_date) 만 가볍게 읽어옵니다. (일일 스냅샷용)"""
+        for note_id, category, next_review_date in self._iter_note_rows(
+            "id, category, next_review_date", "next_review_date <= ?", (_to_iso(today),)
+        ):
+            yield note_id, category, _from_iso(next_review_date)
+
+    def iter_notes(self, batch_size=1000):
+        """모든 노트를 ID 순서로 조금씩 읽어옵니다. (한 번에 전부 메모리에 올리지 않음)"""
+        last_id = -1
+        while True:
+            with self._pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT * FROM notes WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                    (self.user_id, last_id, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_note(row)
+            last_id = rows[-1]["id"]
+
+    def iter_schedule_state(self):
+        """예측 시뮬레이션용 (next_review_date, current_interval, 난이도별 평가 횟수) 를 노트마다 반환합니다."""
+        for row in self._iter_note_rows(f"id, next_review_date, current_interval, {', '.join(COUNT_COLUMNS)}"):
+            yield _from_iso(row[1]), row[2], list(row[3:])
+
+    def _iter_note_rows(self, columns, where=None, params=(), batch_size=FETCH_BATCH_SIZE):
+        """
+        이 사용자의 노트에서 columns(첫 컬럼은 id)를 ID 순서로 batch_size개씩 나누어 읽어 한 행씩 반환합니다.
+        한 묶음을 읽는 동안만 연결을 빌리므로 호출한 쪽이 끝까지 순회하지 않거나 천천히 순회해도 연결 풀을 붙잡지 않습니다.
+        (대신 묶음 사이에 다른 세션이 저장한 변경은 다음 묶음부터 보일 수 있음)
+        """
+        sql = f"SELECT {columns} FROM notes WHERE user_id = ? AND id > ?"
+        if where:
+            sql += f" AND {where}"
+        sql += " ORDER BY id LIMIT ?"
+        last_id = -1
+        while True:
+            with self._pool.connection() as conn:
+                rows = conn.execute(sql, (self.user_id, last_id, *params, batch_size)).fetchall()
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def review_log(self, note_id=None):
+        """복습 이벤트를 열 지향 ReviewLog로 읽어옵니다. (note_id가 없으면 이 사용자의 전체)"""
+        log = ReviewLog()
+        sql = (
+            "SELECT e.note_id, e.day, e.difficulty, e.interval_used FROM review_events e "
+            "JOIN notes n ON n.id = e.note_id WHERE n.user_id = ?"
+        )
+        params = [self.user_id]
+        if note_id is not None:
+            sql += " AND e.note_id = ?"
+            params.append(note_id)
+        with self._pool.connection() as conn:
+            for event_note_id, day, difficulty, interval_used in conn.execute(sql + " ORDER BY e.rowid", params):
+                log.note_ids.append(event_note_id)
+                log.days.append(day)
+                log.difficulties.append(difficulty)
+                log.intervals.append(interval_used)
+        return log
+
+    def iter_review_events(self, batch_size=500):
+        """
+        복습 이벤트를 노트 ID 순서(같은 노트 안에서는 기록 순서)로 하나씩 읽어옵니다.
+        노트 batch_size개 단위로 나누어 읽으므로 순회하는 동안 연결을 붙잡지 않습니다.
+        """
+        for note_ids in self._iter_note_id_batches(batch_size):
+            placeholders = ",".join("?" * len(note_ids))
+            with self._pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT note_id, day, difficulty, interval_used FROM review_events "
+                    f"WHERE note_id IN ({placeholders}) ORDER BY note_id, rowid",
+                    note_ids,
+                ).fetchall()
+            for note_id, day, difficulty, interval_used in rows:
+                yield {
+                    "note_id": note_id,
+                    "date": date.fromordinal(day),
+                    "difficulty": DIFFICULTIES[difficulty],
+                    "interval_used": interval_used,
+                }
+
+    def _iter_note_id_batches(self, batch_size):
+        batch = []
+        for (note_id,) in self._iter_note_rows("id"):
+            batch.append(note_id)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def revision(self):
+        """이 사용자의 노트에 쓰기가 일어날 때마다 증가하는 번호. 캐시 무효화 키로 사용합니다."""
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT revision FROM users WHERE user_id = ?", (self.user_id,)).fetchone()[0]
+
+    def ids_by_category(self, category):
+        with self._pool.connection() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT id FROM notes WHERE user_id = ? AND category = ?", (self.user_id, category)
+            )]
+
+    def ids_by_tag(self, tag):
+        with self._pool.connection() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT t.note_id FROM note_tags t JOIN notes n ON n.id = t.note_id WHERE t.tag = ? AND n.user_id = ?",
+                (tag, self.user_id),
+            )]
+
+    def ids_by_type(self, note_type):
+        with self._pool.connection() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT id FROM notes WHERE user_id = ? AND type = ?", (self.user_id, note_type)
+            )]
+
+    def categories(self):
+        """비어 있지 않은 카테고리 목록 ((user_id, category) 인덱스만 읽음)"""
+        with self._pool.connection() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT category FROM notes WHERE user_id = ? AND category != '' ORDER BY category",
+                (self.user_id,),
+            )]
+
+    def tags(self):
+        with self._pool.connection() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT t.tag FROM notes n JOIN note_tags t ON t.note_id = n.id WHERE n.user_id = ? ORDER BY t.tag",
+                (self.user_id,),
+            )]
+
+    # --- 사용자 설정 ---
+    def get_goal(self):
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT goal FROM users WHERE user_id = ?", (self.user_id,)).fetchone()[0]
+
+    def set_goal(self, goal):
+        with self._pool.connection() as conn, conn:
+            conn.execute("UPDATE users SET goal = ? WHERE user_id = ?", (goal or "", self.user_id))
+
+    def get_interval_params(self):
+        """복습 기록으로 맞춘 간격 배수 (interval_optimizer 참고). 아직 맞추지 않았으면 None"""
+        with self._pool.connection() as conn:
+            value = conn.execute("SELECT interval_params FROM users WHERE user_id = ?", (self.user_id,)).fetchone()[0]
+        return json.loads(value) if value else None
+
+    def set_interval_params(self, params):
+        """간격 배수를 저장합니다. (None이면 기본 배수로 되돌림) 다른 프로세스도 알 수 있도록 수정 번호를 올립니다."""
+        with self._pool.connection() as conn, conn:
+            conn.execute(
+                "UPDATE users SET interval_params = ? WHERE user_id = ?",
+                (json.dumps(params, ensure_ascii=False) if params else None, self.user_id),
+            )
+            return self._bump_revision(conn)
+
+    def note_categories(self):
+        """(note_id, 카테고리) 목록 (카테고리별 간격 배수를 맞출 때 사용)"""
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT id, category FROM notes WHERE user_id = ?", (self.user_id,)).fetchall()
+
+    # --- 쓰기 (노트 단위 증분 upsert) ---
+    def _insert_events(self, conn, events):
+        conn.executemany(
+            "INSERT INTO review_events (note_id, day, difficulty, interval_used) VALUES (?, ?, ?, ?)",
+            events.rows(),
+        )
+
+    def _bump_revision(self, conn):
+        return conn.execute(
+            "UPDATE users SET revision = revision + 1 WHERE user_id = ? RETURNING revision", (self.user_id,)
+        ).fetchone()[0]
+
+    def upsert_many(self, notes, events=None):
+        """
+        노트를 저장하고, 함께 전달된 복습 이벤트(ReviewLog)를 같은 트랜잭션으로 기록합니다. 반환값: 새 수정 번호
+        version이 없는 노트는 새로 추가하고, 있는 노트는 저장소의 version이 같을 때만 고칩니다.
+        다른 세션이 먼저 고친 노트가 하나라도 있으면 아무것도 저장하지 않고 ConflictError를 발생시킵니다.
+        """
+        notes = list(notes)
+        if not notes:
+            return None
+        inserts = [note for note in notes if note.get("version") is None]
+        updates = [note for note in notes if note.get("version") is not None]
+        columns = ", ".join(self._COLUMNS)
+        placeholders = ", ".join("?" * (len(self._COLUMNS) + 1))
+        assignments = ", ".join(f"{col} = ?" for col in self._COLUMNS if col != "id")
+        with self._pool.connection() as conn, conn:
+            try:
+                conn.executemany(
+                    f"INSERT INTO notes ({columns}, user_id) VALUES ({placeholders})",
+                    [(note["id"], *self._note_values(note), self.user_id) for note in inserts],
+                )
+            except sqlite3.IntegrityError:  # 같은 ID가 이미 있음
+                raise ConflictError(note["id"] for note in inserts) from None
+            update_sql = f"UPDATE notes SET {assignments}, version = version + 1 WHERE id = ? AND user_id = ? AND version = ?"
+            conflicts = [
+                note["id"] for note in updates
+                if not conn.execute(update_sql, (*self._note_values(note), note["id"], self.user_id, note["version"])).rowcount
+            ]
+            if conflicts:  # 예외가 나면 트랜잭션 전체를 되돌림
+                raise ConflictError(conflicts)
+            conn.executemany(
+                "DELETE FROM note_tags WHERE note_id = ?", [(note["id"],) for note in notes]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO note_tags (tag, note_id) VALUES (?, ?)",
+                [(tag, note["id"]) for note in notes for tag in note["tags"]],
+            )
+            if events:
+                self._insert_events(conn, events)
+            # ID를 직접 지정해 저장한 경우에도 다음에 발급할 ID가 겹치지 않도록 맞춤
+            conn.execute(
+                "UPDATE meta SET value = MAX(value, (SELECT MAX(id) + 1 FROM notes)) WHERE key = 'next_id'"
+            )
+            revision = self._bump_revision(conn)
+        # 저장에 성공한 뒤에만 노트의 version과 정답 키를 저장소와 맞춤
+        for note in inserts:
+            note["version"] = 0
+        for note in updates:
+            note["version"] += 1
+        for note in notes:
+            note["answer_key"] = answer_key(note_answer(note))
+        return revision
+
+    def delete_many(self, note_ids):
+        """
+        노트와 그 태그, 복습 이벤트를 한 트랜잭션으로 삭제합니다. 삭제된 ID는 다시 발급하지 않습니다.
+        다른 사용자의 노트는 건드리지 않습니다. 반환값: 새 수정 번호
+        """
+        note_ids = list(note_ids)
+        if not note_ids:
+            return None
+        with self._pool.connection() as conn, conn:
+            cursor = conn.executemany(
+                "DELETE FROM notes WHERE id = ? AND user_id = ?", [(note_id, self.user_id) for note_id in note_ids]
+            )
+            if cursor.rowcount:
+                # 다른 사용자의 ID는 notes에서 지워지지 않았으므로 태그/이벤트도 남겨 둠
+                orphan_ids = [
+                    (note_id,) for note_id in note_ids
+                    if conn.execute("SELECT 1 FROM notes WHERE id = ?", (note_id,)).fetchone() is None
+                ]
+                conn.executemany("DELETE FROM note_tags WHERE note_id = ?", orphan_ids)
+                conn.executemany("DELETE FROM review_events WHERE note_id = ?", orphan_ids)
+            return self._bump_revision(conn)
+
+    def allocate_ids(self, count=1):
+        """
+        새 노트 ID를 count개 발급합니다. (모든 사용자가 함께 쓰는 단조 증가 카운터, 삭제된 ID는 재사용하지 않음)
+        카운터 증가는 하나의 쓰기 트랜잭션이므로 여러 세션이 동시에 발급해도 겹치지 않습니다.
+        """
+        with self._pool.connection() as conn, conn:
+            end = conn.execute(
+                "UPDATE meta SET value = value + ? WHERE key = 'next_id' RETURNING value", (count,)
+            ).fetchone()[0]
+        return range(end - count, end)
+
+    def close(self):
+        if self._owns_pool:
+            self._pool.close()
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from profiling import stage
+from review_log import new_review_stats
+from scheduler import calculate_next_review_date, growth_factors_for
+
+# 노트 유형과 유형별 추천 복습 모드
+QA_NOTE_TYPE = "질답(Q&A) 노트"
+FLASHCARD_NOTE_TYPE = "외우기(플래시카드) 노트"
+NOTE_TYPES = [QA_NOTE_TYPE, FLASHCARD_NOTE_TYPE]
+REVIEW_MODES = {QA_NOTE_TYPE: "주관식", FLASHCARD_NOTE_TYPE: "플래시카드"}
+
+
+def parse_tags(tags):
+    """쉼표로 구분된 태그 문자열(또는 목록)을 태그 목록으로 정리합니다."""
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return [t.strip() for t in tags if t and t.strip()]
+
+
+def is_content_empty(note_type, content):
+    """질문/앞면과 답변/뒷면 중 하나라도 비어 있으면 True (새 노트 폼과 일괄 가져오기 공통 규칙)"""
+    if note_type == QA_NOTE_TYPE:
+        return not content.get("question") or not content.get("answer")
+    # 외우기(플래시카드) 노트
+    return not content.get("front") or not content.get("back")
+
+
+def validate_note(note):
+    """저장하기 전에 텍스트 필드가 모두 문자열인지 확인합니다. (색인 갱신 중에 실패하지 않도록) 잘못되면 ValueError"""
+    if not isinstance(note["title"], str) or not isinstance(note["category"], str):
+        raise ValueError(f"노트 {note['id']}: 제목과 카테고리는 문자열이어야 합니다.")
+    if not all(isinstance(tag, str) for tag in note["tags"]):
+        raise ValueError(f"노트 {note['id']}: 태그는 문자열이어야 합니다.")
+    if not all(isinstance(value, str) for value in note["content"].values()):
+        raise ValueError(f"노트 {note['id']}: 내용은 문자열이어야 합니다.")
+
+
+def build_note(note_id, note_type, title, tags, category, content, today):
+    """새 노트 딕셔너리를 만들고 첫 복습 일정을 잡습니다."""
+    return {
+        "id": note_id,
+        "type": note_type,
+        "title": title if title else (content.get("front") or content.get("question") or "새 노트")[:30] , # 제목 없으면 내용 앞부분 30자
+        "tags": parse_tags(tags),
+        "category": category or "",
+        "content": content,
+        "created_date": today,
+        "last_reviewed_date": None,
+        "next_review_date": today + timedelta(days=1), # 첫 복습은 1일 뒤
+        "current_interval": 1, # 첫 복습 간격
+        "initial_review_mode": REVIEW_MODES[note_type], # 추천 복습 모드 저장
+        **new_review_stats(), # 복습 횟수, 마지막 난이도 등 집계 (이력 자체는 복습 이벤트 로그에 저장)
+    }
+
+
+def apply_review(note, difficulty, today, events, interval_params=None):
+    """
+    난이도 평가를 노트에 반영합니다. (다음 복습일 계산, 집계 갱신, 복습 이벤트 기록)
+    저장은 하지 않으므로 여러 평가를 모아 한 번에 저장할 수 있습니다.
+    interval_params: 복습 기록으로 맞춘 간격 배수 (없으면 기본 배수)
+    """
+    # 다음 복습일 계산 및 업데이트
+    with stage("calculate_next_review_date"):
+        next_review_date, next_interval = calculate_next_review_date(
+            today,
+            difficulty,
+            note['current_interval'],
+            growth_factors_for(interval_params, note['category']),
+        )
+
+    note['last_reviewed_date'] = today
+    note['next_review_date'] = next_review_date
+    note['current_interval'] = next_interval
+    events.record(note, difficulty, today, next_interval)
+    return next_review_date
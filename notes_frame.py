@@ -0,0 +1,113 @@
+import pandas as pd
+
+from review_log import LAPSE_CODES
+from scheduler import DIFFICULTIES
+
+# 통계 페이지 노트 목록의 컬럼 (표시 순서)
+NOTE_TABLE_COLUMNS = ["ID", "제목", "유형", "카테고리", "태그", "생성일", "마지막 복습일", "다음 복습 예정일", "복습 횟수"]
+# 오답 노트 표의 컬럼
+DIFFICULT_TABLE_COLUMNS = ["제목", "유형", "마지막 난이도", "마지막 평가일", "다음 복습 예정일"]
+
+DATE_COLUMNS = ["생성일", "마지막 복습일", "다음 복습 예정일"]
+CATEGORY_COLUMNS = ["유형", "카테고리"]
+LAPSE_DIFFICULTIES = [DIFFICULTIES[code] for code in LAPSE_CODES]
+
+
+def _note_row(note):
+    return {
+        "ID": note['id'],
+        "제목": note['title'],
+        "유형": note['type'],
+        "카테고리": note['category'],
+        "태그": ", ".join(note['tags']),
+        "생성일": note['created_date'],
+        "마지막 복습일": note['last_reviewed_date'],
+        "다음 복습 예정일": note['next_review_date'],
+        "복습 횟수": note['review_count'],
+        "마지막 난이도": note['last_difficulty'],
+    }
+
+
+def _typed(frame):
+    """날짜는 datetime64, 반복되는 문자열은 category로 변환합니다."""
+    for column in DATE_COLUMNS:
+        frame[column] = pd.to_datetime(frame[column])
+    for column in CATEGORY_COLUMNS:
+        frame[column] = frame[column].astype("category")
+    frame["마지막 난이도"] = pd.Categorical(frame["마지막 난이도"], categories=DIFFICULTIES)
+    frame["복습 횟수"] = frame["복습 횟수"].astype("int64")
+    return frame
+
+
+def _format_dates(frame):
+    """화면에 보여줄 행만 문자열 날짜로 변환합니다."""
+    frame = frame.copy()
+    for column in frame.select_dtypes("datetime").columns:
+        frame[column] = frame[column].dt.strftime('%Y-%m-%d').fillna("N/A")
+    return frame
+
+
+# --- 노트 목록 DataFrame 캐시 ---
+class NotesFrame:
+    """
+    통계 페이지용 노트 DataFrame을 세션에 유지합니다. (인덱스 = 노트 ID)
+    노트가 추가/평가되면 해당 행만 모아 두었다가 다음 조회 때 한 번에 반영하고,
+    날짜 문자열 변환은 화면에 보이는 행에만 적용합니다.
+    """
+
+    def __init__(self, notes=()):
+        rows = [_note_row(note) for note in notes]
+        frame = pd.DataFrame.from_records(rows, columns=NOTE_TABLE_COLUMNS + ["마지막 난이도"])
+        self._frame = _typed(frame).set_index("ID", drop=False)
+        self._pending = {}  # note_id -> 아직 반영하지 않은 행
+
+    def __len__(self):
+        self._flush()
+        return len(self._frame)
+
+    def upsert(self, note):
+        self._pending[note['id']] = _note_row(note)
+
+    def remove(self, note_id):
+        self._flush()
+        self._frame = self._frame.drop(index=note_id, errors="ignore")
+
+    def _flush(self):
+        if not self._pending:
+            return
+        updates = _typed(pd.DataFrame.from_records(list(self._pending.values()))).set_index("ID", drop=False)
+        self._pending.clear()
+        for column in CATEGORY_COLUMNS:
+            # 새 값이 생기면 범주 목록을 합쳐야 행 단위 대입이 가능함
+            categories = self._frame[column].cat.categories.union(updates[column].cat.categories)
+            self._frame[column] = self._frame[column].cat.set_categories(categories)
+            updates[column] = updates[column].cat.set_categories(categories)
+
+        existing = updates.index.isin(self._frame.index)
+        if existing.any():
+            self._frame.loc[updates.index[existing]] = updates[existing]
+        if not existing.all():
+            self._frame = pd.concat([self._frame, updates[~existing]])
+
+    @property
+    def frame(self):
+        self._flush()
+        return self._frame
+
+    def note_table(self, note_ids=None, offset=0, limit=None):
+        """노트 목록 표의 한 페이지를 반환합니다. note_ids가 주어지면 그 순서대로 해당 노트만 보여줍니다."""
+        frame = self.frame if note_ids is None else self.frame.loc[list(note_ids)]
+        end = None if limit is None else offset + limit
+        return _format_dates(frame.iloc[offset:end][NOTE_TABLE_COLUMNS])
+
+    def difficult_table(self, offset=0, limit=None):
+        """
+        마지막 평가가 '어려웠음'/'전혀 기억나지 않음'인 노트 표(오답 노트)의 한 페이지를 반환합니다.
+        반환값: (offset부터 limit개 행의 표, 전체 오답 노트 수)
+        """
+        frame = self.frame
+        difficult = frame[frame["마지막 난이도"].isin(LAPSE_DIFFICULTIES)]
+        end = None if limit is None else offset + limit
+        page = difficult.iloc[offset:end]
+        page = page.assign(**{"마지막 평가일": page["마지막 복습일"]})
+        return _format_dates(page[DIFFICULT_TABLE_COLUMNS]), len(difficult)
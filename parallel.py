@@ -0,0 +1,23 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 한 번에 만드는 NumPy 중간 배열의 원소 개수 상한 (메모리 사용량 제한, 복습량 예측과 간격 배수 맞추기에서 함께 씀)
+CHUNK_ELEMENTS = 4_000_000
+
+
+def workers_from_env(name):
+    """환경 변수 name에 지정된 프로세스 수 (0 또는 미설정이면 None -> 현재 프로세스에서 실행)"""
+    return int(os.environ.get(name, "0")) or None
+
+
+def run_jobs(function, jobs, workers=None):
+    """
+    jobs의 각 항목으로 function을 실행해 결과를 같은 순서로 반환합니다.
+    workers가 2 이상이고 작업이 둘 이상이면 프로세스 풀에서 병렬로 실행합니다.
+    (function과 작업은 다른 프로세스로 보낼 수 있도록 모듈 최상위 함수와 pickle 가능한 값이어야 함)
+    """
+    jobs = list(jobs)
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            return list(pool.map(function, jobs))
+    return [function(job) for job in jobs]
@@ -0,0 +1,147 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+# 환경 변수 REVIEW_PROFILING=1 이면 모든 세션에서 측정 (아니면 ?profile=1 쿼리로 켬)
+PROFILING_ENV = os.environ.get("REVIEW_PROFILING") == "1"
+# 단계별로 보관할 최근 측정값 수 (백분위수 계산용)
+PROFILE_HISTORY_SIZE = 200
+PERCENTILES = (50, 90, 99)
+
+# 측정 단계 이름 -> 패널 표시 이름
+STAGE_LABELS = {
+    "rerun": "재실행 전체",
+    "sorting": "복습 대상 정렬",
+    "due_filter": "복습 대상 필터",
+    "search_filter": "검색",
+    "dataframe": "DataFrame 구성",
+    "widgets": "위젯 렌더링",
+    "calculate_next_review_date": "다음 복습일 계산",
+}
+
+_local = threading.local()  # 스크립트 실행 스레드별 현재 측정기
+_NULL_STAGE = nullcontext()
+
+
+# --- 재실행 단위 측정기 ---
+class RerunProfiler:
+    """
+    Streamlit 재실행 한 번 동안 단계별 경과 시간(벽시계)을 모으고,
+    재실행이 끝나면 단계마다 최근 PROFILE_HISTORY_SIZE개 값을 보관해 백분위수를 계산합니다.
+    use_cprofile이 켜져 있으면 재실행 전체를 cProfile로 함께 기록합니다.
+    """
+
+    def __init__(self, history_size=PROFILE_HISTORY_SIZE):
+        self.history_size = history_size
+        self.history = defaultdict(lambda: deque(maxlen=history_size))  # "page/stage" -> 최근 값(초)
+        self.last_run = None  # 직전에 끝난 재실행 결과
+        self.use_cprofile = False
+        self.last_cprofile = None  # 직전 재실행의 pstats 덤프 (바이트)
+        self._run = None
+        self._cprofile = None
+
+    def start_rerun(self, page):
+        # st.rerun()으로 중간에 끊긴 재실행은 여기서 마무리함
+        if self._run is not None:
+            self.finish_rerun(interrupted=True)
+        self._run = {"page": page, "started": time.perf_counter(), "stages": defaultdict(lambda: [0.0, 0])}
+        if self.use_cprofile:
+            self._cprofile = cProfile.Profile()
+            try:
+                self._cprofile.enable()
+            except ValueError:  # 다른 세션이 이미 cProfile을 실행 중인 경우 (Python 3.12+)
+                self._cprofile = None
+        _local.profiler = self
+
+    def record(self, name, seconds):
+        if self._run is None:
+            return
+        stage = self._run["stages"][name]
+        stage[0] += seconds
+        stage[1] += 1
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def finish_rerun(self, interrupted=False):
+        run, self._run = self._run, None
+        if _local.__dict__.get("profiler") is self:
+            del _local.profiler
+        if run is None:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self.last_cprofile = _dump_stats(self._cprofile)
+            self._cprofile = None
+        total = time.perf_counter() - run["started"]
+        stages = {"rerun": (total, 1), **{name: tuple(value) for name, value in run["stages"].items()}}
+        for name, (seconds, _) in stages.items():
+            self.history[f"{run['page']}/{name}"].append(seconds)
+        self.last_run = {
+            "page": run["page"],
+            "interrupted": interrupted,
+            "stages": {name: {"ms": seconds * 1000, "calls": calls} for name, (seconds, calls) in stages.items()},
+        }
+
+    def percentiles(self):
+        """단계별 최근 측정값의 백분위수(ms)와 표본 수를 반환합니다."""
+        rows = []
+        for key, values in sorted(self.history.items()):
+            page, name = key.split("/", 1)
+            points = np.percentile(np.fromiter(values, dtype=float, count=len(values)) * 1000, PERCENTILES)
+            rows.append({
+                "page": page,
+                "stage": name,
+                **{f"p{p}_ms": round(float(v), 3) for p, v in zip(PERCENTILES, points)},
+                "samples": len(values),
+            })
+        return rows
+
+    def to_json(self):
+        return json.dumps(
+            {"last_run": self.last_run, "percentiles": self.percentiles()}, ensure_ascii=False, indent=2
+        )
+
+
+def _dump_stats(profile):
+    """cProfile 결과를 pstats 파일 형식의 바이트로 만듭니다. (snakeviz 등에서 바로 열 수 있음)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rerun.prof")
+        pstats.Stats(profile).dump_stats(path)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def cprofile_summary(data, limit=20):
+    """pstats 덤프에서 누적 시간 상위 limit개 함수를 문자열로 반환합니다."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rerun.prof")
+        with open(path, "wb") as f:
+            f.write(data)
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+# --- 계측 지점에서 쓰는 함수 ---
+def stage(name):
+    """
+    현재 스레드에서 측정 중이면 name 단계의 시간을 재는 컨텍스트를, 아니면 아무 일도 하지 않는 컨텍스트를 반환합니다.
+    측정을 켜지 않은 세션에서는 스레드 로컬 조회 한 번만 추가됩니다.
+    """
+    profiler = getattr(_local, "profiler", None)
+    return _NULL_STAGE if profiler is None else profiler.stage(name)
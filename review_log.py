@@ -0,0 +1,72 @@
+from array import array
+
+import numpy as np
+
+from scheduler import DIFFICULTIES, DIFFICULTY_CODES, FORGOT_CODE
+
+# 오답(실수)으로 보는 난이도 코드: '어려웠음', '전혀 기억나지 않음'
+LAPSE_CODES = (DIFFICULTY_CODES['어려웠음'], FORGOT_CODE)
+
+
+# --- 노트별 복습 집계값 ---
+def new_review_stats():
+    """새 노트의 복습 집계 필드 (review_history 목록 대신 노트에 저장)"""
+    return {
+        "review_count": 0, # 복습 횟수
+        "lapse_count": 0, # '어려웠음'/'전혀 기억나지 않음' 평가 횟수
+        "streak": 0, # 연속으로 '쉬웠음'/'보통' 평가를 받은 횟수
+        "last_difficulty": None, # 마지막 난이도 평가
+        "difficulty_counts": [0] * len(DIFFICULTIES), # 난이도별 평가 횟수
+    }
+
+
+# --- 열 지향 복습 이벤트 로그 ---
+class ReviewLog:
+    """
+    복습 이벤트(노트 ID, 날짜, 난이도, 적용된 간격)를 열마다 array에 저장하는 로그.
+    이벤트마다 딕셔너리를 만들지 않으므로 이벤트 하나에 약 17바이트만 사용합니다.
+    날짜는 date.toordinal() 값, 난이도는 scheduler.DIFFICULTIES의 코드(0~3)로 저장합니다.
+    """
+
+    __slots__ = ("note_ids", "days", "difficulties", "intervals")
+
+    def __init__(self):
+        self.note_ids = array("q")
+        self.days = array("i")
+        self.difficulties = array("b")
+        self.intervals = array("i")
+
+    def __len__(self):
+        return len(self.note_ids)
+
+    def append(self, note_id, review_date, difficulty_code, interval_used):
+        self.note_ids.append(note_id)
+        self.days.append(review_date.toordinal())
+        self.difficulties.append(difficulty_code)
+        self.intervals.append(interval_used)
+
+    def record(self, note, difficulty, review_date, interval_used):
+        """이벤트를 로그에 추가하고 노트의 집계값(복습 횟수, 마지막 난이도, 오답 횟수, 연속 정답)을 갱신합니다."""
+        code = DIFFICULTY_CODES.get(difficulty, FORGOT_CODE)
+        self.append(note["id"], review_date, code, interval_used)
+        note["review_count"] += 1
+        note["difficulty_counts"][code] += 1
+        note["last_difficulty"] = DIFFICULTIES[code]
+        if code in LAPSE_CODES:
+            note["lapse_count"] += 1
+            note["streak"] = 0
+        else:
+            note["streak"] += 1
+
+    def rows(self):
+        """(note_id, 날짜 ordinal, 난이도 코드, 간격) 튜플을 순서대로 반환합니다. (DB 저장용)"""
+        return zip(self.note_ids, self.days, self.difficulties, self.intervals)
+
+    def to_numpy(self):
+        """복사 없이 NumPy 배열로 열을 반환합니다. (벡터화 분석용)"""
+        return {
+            "note_id": np.frombuffer(self.note_ids, dtype=np.int64),
+            "day": np.frombuffer(self.days, dtype=np.int32),
+            "difficulty": np.frombuffer(self.difficulties, dtype=np.int8),
+            "interval_used": np.frombuffer(self.intervals, dtype=np.int32),
+        }
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+import numpy as np
+
+# 난이도 평가 목록 (순서가 곧 난이도 코드: 0~3)
+DIFFICULTIES = ('쉬웠음', '보통', '어려웠음', '전혀 기억나지 않음')
+DIFFICULTY_CODES = {difficulty: code for code, difficulty in enumerate(DIFFICULTIES)}
+FORGOT_CODE = DIFFICULTY_CODES['전혀 기억나지 않음']
+
+# 난이도별 간격 배수와 첫 복습 간격 ('전혀 기억나지 않음'은 항상 1일)
+# 간격 배수는 복습 기록으로 맞춘 값(interval_optimizer)이 저장되어 있으면 그 값을 대신 사용
+GROWTH_FACTORS = (1.8, 1.2, 0.5, 0.0)
+INITIAL_INTERVALS = (7, 3, 1, 1)
+
+
+def growth_factors_for(interval_params, category=None):
+    """
+    저장된 간격 배수(interval_optimizer.fit_interval_params 결과)에서 카테고리의 난이도별 배수를 꺼냅니다.
+    카테고리별 값이 없으면 사용자 전체 값, 맞춘 값이 없으면 기본 배수를 반환합니다.
+    """
+    if not interval_params:
+        return GROWTH_FACTORS
+    fitted = interval_params["categories"].get(category) or interval_params["default"]
+    return (*fitted["multipliers"], GROWTH_FACTORS[FORGOT_CODE])
+
+
+# --- 복습 주기 계산 함수 ---
+def calculate_next_review_date(current_date, difficulty, last_interval=0, growth_factors=GROWTH_FACTORS):
+    """
+    난이도와 이전 복습 간격에 따라 다음 복습 날짜를 계산합니다.
+    last_interval: 이전 복습까지의 일수 (첫 복습 시 0)
+    difficulty: '쉬웠음', '보통', '어려웠음', '전혀 기억나지 않음'
+    growth_factors: 난이도별 간격 배수 (growth_factors_for 참고)
+    """
+    code = DIFFICULTY_CODES.get(difficulty, FORGOT_CODE)
+    if code == FORGOT_CODE:
+        # 거의 즉시 다시 복습 (내일)
+        next_interval = 1
+    else:
+        # 쉬웠음: 지수적으로 증가, 보통: 조금 더 길게, 어려웠음: 더 짧게
+        next_interval = max(1, int(last_interval * growth_factors[code]) if last_interval > 0 else INITIAL_INTERVALS[code])
+
+    return current_date + timedelta(days=next_interval), next_interval
+
+
+# --- 일괄(벡터화) 복습 주기 계산 ---
+def to_difficulty_codes(difficulties):
+    """난이도 문자열 목록을 난이도 코드 배열(int8)로 변환합니다. 알 수 없는 값은 '전혀 기억나지 않음'으로 처리합니다."""
+    return np.fromiter(
+        (DIFFICULTY_CODES.get(difficulty, FORGOT_CODE) for difficulty in difficulties),
+        dtype=np.int8,
+    )
+
+
+def calculate_next_intervals(difficulty_codes, last_intervals, growth_factors=GROWTH_FACTORS):
+    """
+    calculate_next_review_date의 간격 계산을 배열 단위로 수행합니다.
+    max(1, int(...)) 절사 규칙까지 스칼라 함수와 결과가 정확히 같습니다.
+    """
+    codes = np.asarray(difficulty_codes)
+    codes = np.where((codes >= 0) & (codes < FORGOT_CODE), codes, FORGOT_CODE)
+    last = np.asarray(last_intervals, dtype=np.int64)
+
+    growth = np.asarray(growth_factors, dtype=np.float64)[codes]
+    initial = np.asarray(INITIAL_INTERVALS, dtype=np.int64)[codes]
+    # int()와 같은 0 방향 절사 (Python과 동일한 float64 곱셈)
+    scaled = np.trunc(last * growth).astype(np.int64)
+    next_intervals = np.maximum(1, np.where(last > 0, scaled, initial))
+    return np.where(codes == FORGOT_CODE, 1, next_intervals)
+
+
+def calculate_next_review_dates(current_dates, difficulty_codes, last_intervals, growth_factors=GROWTH_FACTORS):
+    """
+    여러 노트의 다음 복습일을 한 번에 계산합니다.
+    current_dates: 날짜 배열(datetime64[D] 또는 date 목록)
+    difficulty_codes: 난이도 코드 배열 (to_difficulty_codes 참고)
+    last_intervals: 이전 복습 간격 배열
+    반환값: (다음 복습일 datetime64[D] 배열, 다음 간격 int64 배열)
+    """
+    dates = np.asarray(current_dates, dtype='datetime64[D]')
+    next_intervals = calculate_next_intervals(difficulty_codes, last_intervals, growth_factors)
+    return dates + next_intervals.astype('timedelta64[D]'), next_intervals
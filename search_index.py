@@ -0,0 +1,159 @@
+import heapq
+import unicodedata
+from collections import OrderedDict, defaultdict
+
+# 문자 n-gram 크기 (한글은 음절 단위 2-gram이 검색 품질과 색인 크기의 균형이 좋음)
+GRAM_SIZE = 2
+
+# 필드별 가중치 (제목에서 찾은 결과가 가장 위로)
+FIELD_WEIGHTS = {'title': 4.0, 'tags': 3.0, 'category': 2.0, 'content': 1.0}
+_WEIGHTS = tuple(FIELD_WEIGHTS.values())
+
+# 한 검색에서 교집합할 posting 수 상한 (작은 것부터 교집합하고, 나머지 n-gram은 후보를 직접 확인할 때 걸러짐)
+MAX_QUERY_POSTINGS = 32
+# 점수를 매긴 결과를 보관할 최근 검색어 수 (재실행·페이지 이동 때 다시 채점하지 않음, 색인이 바뀌면 비움)
+RESULT_CACHE_SIZE = 4
+
+
+def normalize_text(text):
+    """전각/반각 등을 통일하고 소문자로 바꿉니다."""
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def _grams(text):
+    """
+    1-gram과 GRAM_SIZE-gram 집합을 만듭니다. (한 글자 검색어도 색인으로 처리하기 위함)
+    검색어는 공백으로 나뉘므로 공백이 걸친 n-gram은 색인하지 않습니다.
+    """
+    text = ' '.join(text.split())
+    grams = set(text)
+    grams.update(map(''.join, zip(*(text[i:] for i in range(GRAM_SIZE)))))
+    grams.discard(' ')
+    return {gram for gram in grams if ' ' not in gram}
+
+
+def _query_grams(term):
+    if len(term) < GRAM_SIZE:
+        return {term}
+    return {term[i:i + GRAM_SIZE] for i in range(len(term) - GRAM_SIZE + 1)}
+
+
+def note_search_fields(note):
+    """검색 대상 필드(제목, 태그, 카테고리, 질문/답변·앞면/뒷면 내용)를 FIELD_WEIGHTS 순서의 튜플로 정규화하여 반환합니다."""
+    return (
+        normalize_text(note['title']),
+        '\n'.join(normalize_text(tag) for tag in note['tags']),
+        normalize_text(note['category']),
+        '\n'.join(normalize_text(value) for value in note['content'].values() if value),
+    )
+
+
+# --- 문자 n-gram 역색인 ---
+class SearchIndex:
+    """
+    노트 검색을 위한 문자 n-gram 역색인.
+    검색어의 n-gram posting을 작은 것부터 교집합하여 후보를 좁힌 뒤, 실제 부분 문자열 포함 여부로 확인하고
+    필드 가중치로 순위를 매겨 요청한 페이지까지만 정렬합니다. 노트 추가·수정 시 해당 노트만 다시 색인합니다.
+    """
+
+    def __init__(self, notes=()):
+        self._postings = defaultdict(set)  # gram -> note_id 집합
+        self._docs = {}  # note_id -> 정규화된 필드 튜플
+        self._results = OrderedDict()  # 검색어 단어 튜플 -> [(-점수, note_id), ...]
+        for note in notes:
+            self.add(note)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, note):
+        fields = note_search_fields(note)
+        self._docs[note['id']] = fields
+        self._results.clear()
+        for gram in _grams('\n'.join(fields)):
+            self._postings[gram].add(note['id'])
+
+    def remove(self, note_id):
+        fields = self._docs.pop(note_id, None)
+        if fields is None:
+            return
+        self._results.clear()
+        for gram in _grams('\n'.join(fields)):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(note_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def update(self, note):
+        """노트를 다시 색인합니다. 검색 대상 필드가 바뀌지 않았다면 아무것도 하지 않습니다."""
+        if self._docs.get(note['id']) == note_search_fields(note):
+            return
+        self.remove(note['id'])
+        self.add(note)
+
+    def _candidates(self, terms):
+        """
+        검색어 n-gram의 posting을 작은 것부터 MAX_QUERY_POSTINGS개까지 교집합합니다.
+        두 글자 이상인 단어가 있으면 한 글자 단어의 1-gram posting(대개 매우 큼)은 쓰지 않습니다.
+        반환된 후보는 모든 단어를 포함한다는 보장이 없으므로 _score로 확인해야 합니다.
+        """
+        grams = set()
+        for term in terms:
+            grams |= _query_grams(term)
+        if any(len(term) >= GRAM_SIZE for term in terms):
+            grams = {gram for gram in grams if len(gram) >= GRAM_SIZE}
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        candidates = postings[0]
+        for posting in postings[1:MAX_QUERY_POSTINGS]:
+            if not candidates:
+                break
+            candidates = candidates & posting
+        return candidates
+
+    def _score(self, fields, terms):
+        score = 0.0
+        for term in terms:
+            term_score = 0.0
+            for text, weight in zip(fields, _WEIGHTS):
+                position = text.find(term)
+                if position < 0:
+                    continue
+                term_score += weight
+                if position == 0 or text[position - 1] in ' \n#':
+                    term_score += weight / 2  # 단어/태그 앞부분과 일치하면 가산점
+            if term_score == 0:
+                return 0.0
+            score += term_score
+        return score
+
+    def _scored(self, terms):
+        scored = self._results.get(terms)
+        if scored is not None:
+            self._results.move_to_end(terms)
+            return scored
+        scored = []
+        for note_id in self._candidates(terms):
+            score = self._score(self._docs[note_id], terms)
+            if score:
+                scored.append((-score, note_id))
+        self._results[terms] = scored
+        if len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return scored
+
+    def search(self, query, offset=0, limit=None):
+        """
+        검색어의 모든 단어(공백 구분)를 포함하는 노트를 관련도 순으로 반환합니다.
+        반환값: (offset부터 limit개의 note_id 목록, 전체 결과 수)
+        """
+        terms = normalize_text(query).split()
+        if not terms:
+            return [], 0
+        scored = self._scored(tuple(terms))
+        if limit is None:
+            scored.sort()
+            return [note_id for _, note_id in scored[offset:]], len(scored)
+        # 전체를 정렬하지 않고 요청한 페이지까지만 뽑음
+        top = heapq.nsmallest(offset + limit, scored)
+        return [note_id for _, note_id in top[offset:]], len(scored)
@@ -0,0 +1,78 @@
+import io
+from datetime import date
+
+import pytest
+
+from bulk_io import EXPORT_FORMATS, export_notes_bytes, grade_answer_sheet, import_notes
+from note_store import SQLiteNoteStore
+from notes import FLASHCARD_NOTE_TYPE, QA_NOTE_TYPE, build_note
+
+TODAY = date(2026, 10, 17)
+
+NOTES = [
+    (QA_NOTE_TYPE, "사과", ["과일", "영어 단어"], "영어", {"question": "사과는 영어로?", "answer": "Apple"}),
+    (FLASHCARD_NOTE_TYPE, "관성", [], "물리", {"front": "관성", "back": "운동 상태를\n유지하려는 성질"}),
+    (FLASHCARD_NOTE_TYPE, "#include", ["c"], "", {"front": "#include", "back": "헤더 파일 포함"}),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteNoteStore(str(tmp_path / "notes.db"))
+    store.upsert_many([build_note(i, *note, TODAY) for i, note in enumerate(NOTES)])
+    return store
+
+
+def _import(store, data, fmt):
+    return import_notes(io.BytesIO(data), fmt, TODAY, store.upsert_many, store.allocate_ids)
+
+
+def _fields(note):
+    return note["type"], note["title"], note["tags"], note["category"], note["content"]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_export_import_round_trip(store, tmp_path, fmt):
+    target = SQLiteNoteStore(str(tmp_path / "notes.db"), "copy")
+    result = _import(target, export_notes_bytes(store, fmt), fmt)
+
+    assert (result.imported, result.error_count) == (len(NOTES), 0)
+    assert [_fields(note) for note in target.iter_notes()] == [_fields(note) for note in store.iter_notes()]
+
+
+def test_anki_tsv_round_trip_keeps_hash_fronts(store, tmp_path):
+    data = export_notes_bytes(store, "tsv")
+    assert data.startswith(b"#separator:tab\n")
+
+    target = SQLiteNoteStore(str(tmp_path / "notes.db"), "copy")
+    result = _import(target, data, "tsv")
+    assert (result.imported, result.error_count) == (len(NOTES), 0)
+    imported = list(target.iter_notes())
+    assert [note["content"]["front"] for note in imported] == ["사과는 영어로?", "관성", "#include"]
+    assert imported[1]["content"]["back"] == "운동 상태를\n유지하려는 성질"
+    assert [note["tags"] for note in imported] == [["과일", "영어_단어"], [], ["c"]]
+
+
+def test_anki_tsv_headers_only_at_top(tmp_path):
+    target = SQLiteNoteStore(str(tmp_path / "notes.db"))
+    data = "#html:false\n#include\t헤더 파일 포함\n#deck:기본\t중간의 헤더 모양 줄\n\n앞\t\n".encode()
+    result = _import(target, data, "tsv")
+
+    assert [note["content"]["front"] for note in target.iter_notes()] == ["#include", "#deck:기본"]
+    assert result.error_count == 1
+    assert result.errors[0][0] == 5  # 뒷면이 빈 줄 (헤더와 빈 줄도 줄 번호에 셈)
+
+
+def test_answer_sheet_grades_against_stored_keys(store):
+    sheet = "id,answer\n0,apple\n1,운동 상태를 유지하려는 성질\n9,없는 노트\nx,잘못된 id\n".encode()
+    result = grade_answer_sheet(io.BytesIO(sheet), "csv", store.get_many)
+
+    assert [(line_no, note_id) for line_no, note_id, _, _ in result.graded] == [(2, 0), (3, 1), (4, 9)]
+    assert [bool(grade and grade.correct) for *_, grade in result.graded] == [True, True, False]
+    assert result.error_count == 1 and result.errors[0][0] == 5
+
+
+def test_every_export_format_is_importable(store, tmp_path):
+    for fmt in EXPORT_FORMATS:
+        target = SQLiteNoteStore(str(tmp_path / f"{fmt}.db"))
+        assert _import(target, export_notes_bytes(store, fmt), fmt).imported == len(NOTES)
@@ -0,0 +1,89 @@
+import random
+from datetime import date, timedelta
+
+from due_snapshot import DueSnapshot
+
+TODAY = date(2026, 10, 17)
+
+
+class FakeStore:
+    """due_entries만 제공하는 저장소 (notes: note_id -> (next_review_date, category))"""
+
+    def __init__(self, notes):
+        self.notes = notes
+        self.reads = 0
+
+    def due_entries(self, today):
+        self.reads += 1
+        for note_id, (next_review_date, category) in self.notes.items():
+            if next_review_date is not None and next_review_date <= today:
+                yield note_id, category, next_review_date
+
+
+def _note(note_id, days, category="C"):
+    return {"id": note_id, "next_review_date": TODAY + timedelta(days=days), "category": category}
+
+
+def _expected_order(notes, today):
+    due = [(when, note_id) for note_id, (when, _) in notes.items() if when is not None and when <= today]
+    return [note_id for _, note_id in sorted(due)]
+
+
+def test_update_keeps_oldest_first_order():
+    store = FakeStore({1: (TODAY, "A"), 2: (TODAY - timedelta(days=3), "B"), 3: (TODAY + timedelta(days=1), "A")})
+    snapshot = DueSnapshot(store)
+    snapshot.ensure_day(TODAY)
+    assert snapshot.due_ids() == [2, 1]
+
+    snapshot.update(_note(4, -5, "B"))  # 새로 밀린 노트는 맨 앞
+    snapshot.update(_note(2, 2, "B"))  # 평가해서 예정일이 밀리면 빠짐
+    snapshot.update(_note(1, -1, "A"))  # 예정일이 바뀌면 새 위치로
+    assert snapshot.due_ids() == [4, 1]
+    assert snapshot.category_counts() == {"B": 1, "A": 1}
+    assert 2 not in snapshot and len(snapshot) == 2
+
+
+def test_remove_drops_entry_and_counts():
+    store = FakeStore({1: (TODAY, "A"), 2: (TODAY, "A"), 3: (TODAY, "B")})
+    snapshot = DueSnapshot(store)
+    snapshot.ensure_day(TODAY)
+    snapshot.remove(2)
+    snapshot.remove(99)  # 없는 노트는 무시
+    assert snapshot.due_ids() == [1, 3]
+    assert snapshot.count("A") == 1 and snapshot.count() == 2
+    snapshot.remove(3)
+    assert snapshot.category_counts() == {"A": 1}
+
+
+def test_day_rollover_rebuilds_once_per_day():
+    notes = {1: (TODAY, "A"), 2: (TODAY + timedelta(days=1), "A")}
+    store = FakeStore(notes)
+    snapshot = DueSnapshot(store)
+    snapshot.ensure_day(TODAY)
+    snapshot.ensure_day(TODAY)
+    assert store.reads == 1 and snapshot.due_ids() == [1]
+
+    tomorrow = TODAY + timedelta(days=1)
+    assert snapshot.ensure_day(tomorrow) == tomorrow
+    assert store.reads == 2 and snapshot.due_ids() == [1, 2]
+    snapshot.update(_note(3, 1))  # 새 기준 날짜로 판단
+    assert snapshot.due_ids() == [1, 2, 3]
+
+
+def test_incremental_order_matches_full_sort():
+    rng = random.Random(0)
+    notes = {note_id: (TODAY + timedelta(days=rng.randint(-10, 3)), rng.choice("ABC")) for note_id in range(300)}
+    snapshot = DueSnapshot(FakeStore(dict(notes)))
+    snapshot.ensure_day(TODAY)
+    for _ in range(1_000):
+        note_id = rng.randrange(350)
+        if rng.random() < 0.2:
+            snapshot.remove(note_id)
+            notes.pop(note_id, None)
+        else:
+            note = _note(note_id, rng.randint(-10, 3), rng.choice("ABC"))
+            snapshot.update(note)
+            notes[note_id] = (note["next_review_date"], note["category"])
+    assert snapshot.due_ids() == _expected_order(notes, TODAY)
+    due_categories = [category for when, category in notes.values() if when <= TODAY]
+    assert snapshot.category_counts() == {category: due_categories.count(category) for category in set(due_categories)}
@@ -0,0 +1,76 @@
+import random
+from datetime import date
+
+import numpy as np
+import pytest
+
+import forecast
+from forecast import difficulty_probabilities, forecast_review_load, review_load_moments
+from scheduler import DIFFICULTIES, GROWTH_FACTORS, calculate_next_review_date
+
+FITTED_FACTORS = (2.37, 1.3, 0.6, 0.0)
+TODAY = date(2026, 10, 17)
+
+
+def simulate(offsets, intervals, probs, horizon, trials, growth_factors, seed=0):
+    """비교 기준이 되는 노트별 몬테카를로 (스칼라 calculate_next_review_date 사용)"""
+    rng = random.Random(seed)
+    loads = np.zeros((trials, horizon))
+    for trial in range(trials):
+        for offset, interval, weights in zip(offsets, intervals, probs):
+            day, current = max(offset, 0), interval
+            while day < horizon:
+                loads[trial, day] += 1
+                difficulty = rng.choices(DIFFICULTIES, weights)[0]
+                next_date, current = calculate_next_review_date(TODAY, difficulty, current, growth_factors)
+                day += (next_date - TODAY).days
+    return loads
+
+
+def test_certain_outcomes_give_exact_schedule():
+    # 항상 '쉬웠음'이면 간격이 정해진 대로 늘어나고 분산은 0
+    offsets, intervals = np.array([0, 2, -5]), np.array([1, 5, 0])
+    probs = np.tile([1.0, 0.0, 0.0, 0.0], (3, 1))
+    mean, variance = review_load_moments(offsets, intervals, probs, 40)
+
+    expected = np.ones(40)  # 간격 1일: int(1 * 1.8) = 1이라 매일 복습
+    expected[[2, 11, 27]] += 1  # 간격 5 -> 9 -> 16 -> 28
+    expected[[0, 7, 19]] += 1  # 밀린 새 노트: 첫 간격 7 -> 12 -> 21
+    assert np.allclose(mean, expected)
+    assert np.allclose(variance, 0)
+
+
+@pytest.mark.parametrize("growth_factors", [GROWTH_FACTORS, FITTED_FACTORS])
+def test_moments_match_monte_carlo(growth_factors):
+    rng = np.random.default_rng(1)
+    offsets = rng.integers(-3, 20, 8)
+    intervals = rng.integers(0, 15, 8)
+    probs = difficulty_probabilities(rng.integers(0, 6, (8, len(DIFFICULTIES))).astype(float))
+    # 격자 칸 평균을 쓰지 않도록 분포를 미리 격자에 맞춤
+    probs = np.rint(probs * forecast.PROFILE_STEPS) / forecast.PROFILE_STEPS
+    probs /= probs.sum(axis=1, keepdims=True)
+
+    mean, variance = review_load_moments(offsets, intervals, probs, 30, growth_factors)
+    loads = simulate(offsets, intervals, probs, 30, 1_500, growth_factors)
+    assert np.abs(mean - loads.mean(axis=0)).max() < 0.15
+    assert np.abs(variance - loads.var(axis=0)).max() < 0.3
+
+
+def test_chunked_and_parallel_runs_agree(monkeypatch):
+    rng = np.random.default_rng(2)
+    offsets, intervals = rng.integers(-10, 60, 300), rng.integers(1, 40, 300)
+    counts = rng.integers(0, 8, (300, len(DIFFICULTIES))).astype(float)
+    single = forecast_review_load(offsets, intervals, counts, horizon=90, growth_factors=FITTED_FACTORS, workers=1)
+
+    monkeypatch.setattr(forecast, "CHUNK_ELEMENTS", 5_000)  # 분포 칸마다 작업 하나
+    chunked = forecast_review_load(offsets, intervals, counts, horizon=90, growth_factors=FITTED_FACTORS, workers=2)
+    for key in ("mean", "p10", "p50", "p90"):
+        assert np.allclose(single[key], chunked[key])
+    assert (single["p10"] <= single["mean"]).all() and (single["mean"] <= single["p90"]).all()
+
+
+def test_empty_and_out_of_horizon_collections():
+    empty = forecast_review_load(np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.zeros((0, 4)), horizon=30)
+    assert not empty["p90"].any()
+    later = forecast_review_load(np.array([30, 45]), np.array([3, 3]), np.ones((2, 4)), horizon=30)
+    assert not later["mean"].any()
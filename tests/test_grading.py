@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from grading import MAX_EDITS, answer_key, bounded_distance, error_limit, grade_answer, grade_batch, normalize_answer
+
+ALPHABETS = ["ab", "abc", "가나다", normalize_answer("망각곡선기억")]
+
+
+def levenshtein(a, b):
+    """비교 기준이 되는 일반 편집 거리 (전체 동적 계획법)"""
+    previous = list(range(len(b) + 1))
+    for i, ch in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j - 1] + (ch != other), previous[j] + 1, current[j - 1] + 1))
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.parametrize("alphabet", ALPHABETS)
+def test_bounded_distance_matches_levenshtein(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(1_500):
+        a = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        b = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        distance = levenshtein(a, b)
+        for limit in range(MAX_EDITS + 1):
+            expected = distance if distance <= limit else limit + 1
+            assert bounded_distance(a, b, limit) == expected, (a, b, limit)
+
+
+def test_bounded_distance_handles_shared_prefix_and_suffix():
+    assert bounded_distance("prefix-a-suffix", "prefix-bc-suffix", 3) == 2
+    assert bounded_distance("same", "same", 0) == 0
+    assert bounded_distance("", "abc", 2) == 3
+    assert bounded_distance("abc", "", 3) == 3
+
+
+def test_normalize_answer_folds_width_case_spacing_and_punctuation():
+    assert normalize_answer("Ｐｙｔｈｏｎ  3!") == normalize_answer("python3")
+    assert normalize_answer("망각 곡선.") == normalize_answer("망각곡선")
+
+
+@pytest.mark.parametrize("a, b", [("12", "1/2"), ("5", "-5"), ("314", "3.14"), ("10", "1.0"), ("1230", "12:30")])
+def test_normalize_answer_keeps_punctuation_inside_numbers(a, b):
+    assert normalize_answer(a) != normalize_answer(b)
+    assert not grade_answer(a, _note(b)).correct
+
+
+def test_normalize_answer_canonicalizes_numbers():
+    assert normalize_answer("1,000원") == normalize_answer("1000 원")
+    assert normalize_answer("\u22125도") == normalize_answer("-5도") == normalize_answer("–5도")
+    assert normalize_answer("COVID-19") == normalize_answer("covid 19")
+    assert normalize_answer("기온은 -5도") == normalize_answer("기온은-5도")
+
+
+def _note(answer):
+    return {"content": {"question": "질문", "answer": answer}}
+
+
+def test_grade_answer_allows_small_typos_only():
+    note = _note("에빙하우스의 망각 곡선")
+    assert grade_answer("에빙하우스의 망각곡선", note) == (True, True, 0)
+    typo = grade_answer("에빙하우스의 망각 곡섬", note)
+    assert typo.correct and not typo.exact and 0 < typo.distance <= error_limit(answer_key("에빙하우스의 망각 곡선"))
+    assert not grade_answer("에빙하우스의 기억 곡선", note).correct
+    assert not grade_answer("", note).correct
+
+
+def test_grade_batch_matches_grade_answer():
+    notes = {1: _note("Apple"), 2: _note("관성의 법칙")}
+    responses = [(1, "apple"), (1, "aple"), (2, "관성 법칙"), (2, "가속도"), (3, "없는 노트")]
+    results = grade_batch(responses, notes)
+    assert results[:4] == [grade_answer(response, notes[note_id]) for note_id, response in responses[:4]]
+    assert results[4] is None
@@ -0,0 +1,164 @@
+import sqlite3
+import threading
+from datetime import date
+
+import pytest
+
+import note_store
+from grading import answer_key
+from note_repository import REVIEW_SAVE_ATTEMPTS, NoteRepository
+from note_store import DEFAULT_USER, ConflictError, ConnectionPool, PoolTimeoutError, SQLiteNoteStore
+from notes import FLASHCARD_NOTE_TYPE, build_note
+
+TODAY = date(2026, 10, 17)
+
+def _note(note_id, title="노트", category="C"):
+    return build_note(note_id, FLASHCARD_NOTE_TYPE, title, "", category, {"front": "앞", "back": "뒤"}, TODAY)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "notes.db")
+
+
+# --- 스키마 ---
+def test_schema_has_user_scoped_indexes(db_path):
+    SQLiteNoteStore(db_path).count()
+
+    conn = sqlite3.connect(db_path)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(notes)")]
+    conn.close()
+    assert {"notes", "review_events", "note_tags", "users", "meta"} <= tables
+    assert {"idx_notes_user", "idx_notes_user_next_review", "idx_notes_user_category", "idx_notes_user_type"} <= indexes
+    assert columns[:3] == ["id", "user_id", "version"]
+    assert list(SQLiteNoteStore._COLUMNS) == [column for column in columns if column not in ("user_id", "version")]
+
+
+def test_reopening_keeps_data_and_users_are_isolated(db_path):
+    store = SQLiteNoteStore(db_path)
+    note = _note(store.allocate_ids(1)[0], title="사과")
+    note["content"] = {"front": "사과", "back": "Apple"}
+    store.upsert_many([note])
+
+    store = SQLiteNoteStore(db_path)
+    other = SQLiteNoteStore(db_path, "alice")
+    assert store.user_id == DEFAULT_USER
+    assert store.count() == 1
+    assert store.get(0)["answer_key"] == answer_key("Apple")
+    assert store.get_interval_params() is None
+    assert other.count() == 0
+    assert other.get(0) is None
+    assert len(other.review_log()) == 0
+    # ID는 사용자와 관계없이 데이터베이스 전체에서 겹치지 않게 발급
+    assert list(other.allocate_ids(2)) == [1, 2]
+    other.upsert_many([_note(1)])
+    assert (store.count(), other.count()) == (1, 1)
+
+
+# --- 낙관적 동시성 제어 ---
+def test_stale_save_raises_and_rolls_back_whole_batch(db_path):
+    store = SQLiteNoteStore(db_path)
+    store.upsert_many([_note(0), _note(1)])
+    first, second = store.get(0), store.get(1)
+
+    fresh = store.get(0)
+    fresh["title"] = "다른 탭"
+    store.upsert_many([fresh])
+
+    first["title"] = "오래된 값"
+    second["title"] = "같이 저장"
+    revision = store.revision()
+    with pytest.raises(ConflictError) as error:
+        store.upsert_many([first, second])
+    assert error.value.note_ids == [0]
+    assert store.get(0)["title"] == "다른 탭"
+    assert store.get(1)["title"] == "노트"
+    assert store.revision() == revision
+
+
+def test_record_reviews_retries_on_conflict(db_path):
+    pool = ConnectionPool(db_path)
+    tab = NoteRepository(SQLiteNoteStore(db_path, pool=pool))
+    tab.save(_note(0))
+    tab.get(0)  # 캐시에 이전 버전을 남겨 둠
+    other = NoteRepository(SQLiteNoteStore(db_path))
+    other.record_reviews([(0, "쉬웠음")], TODAY)
+
+    saved = tab.record_reviews([(0, "보통")], TODAY)
+
+    assert saved[0]["review_count"] == 2
+    stored = tab.store.get(0)
+    assert stored["review_count"] == 2
+    assert stored["difficulty_counts"][:2] == [1, 1]
+    assert [row[2] for row in tab.store.review_log(0).rows()] == [0, 1]
+
+
+def test_record_reviews_gives_up_after_attempts(db_path, monkeypatch):
+    repository = NoteRepository(SQLiteNoteStore(db_path))
+    repository.save(_note(0))
+    calls = []
+
+    def always_conflict(notes, events=None):
+        calls.append(1)
+        raise ConflictError([0])
+
+    monkeypatch.setattr(repository.store, "upsert_many", always_conflict)
+    with pytest.raises(ConflictError):
+        repository.record_reviews([(0, "보통")], TODAY)
+    assert len(calls) == REVIEW_SAVE_ATTEMPTS
+
+
+# --- 연결 풀 ---
+def test_generators_read_in_batches_without_holding_connection(db_path):
+    pool = ConnectionPool(db_path, size=1)
+    store = SQLiteNoteStore(db_path, pool=pool)
+    notes = [_note(i) for i in range(12)]
+    store.upsert_many(notes)
+    repository = NoteRepository(store)
+    repository.record_reviews([(i % 5, "보통") for i in range(9)], TODAY)
+
+    events = list(store.iter_review_events(batch_size=2))
+    assert [event["note_id"] for event in events] == sorted(i % 5 for i in range(9))
+    assert [note_id for note_id, _, _ in store._iter_note_rows("id, category, next_review_date", batch_size=5)] == list(range(12))
+
+    # 순회를 멈춘 생성기가 있어도 다른 스레드가 하나뿐인 연결을 빌릴 수 있어야 함
+    abandoned = store.due_entries(date(2030, 1, 1))
+    next(abandoned)
+    counts = []
+    reader = threading.Thread(target=lambda: counts.append(store.count()))
+    reader.start()
+    reader.join(timeout=5)
+    assert counts == [12]
+
+
+def test_pool_timeout_raises_clear_error(db_path, monkeypatch):
+    monkeypatch.setattr(note_store, "BUSY_TIMEOUT", 0.05)
+    pool = ConnectionPool(db_path, size=1)
+    errors = []
+
+    def acquire():
+        try:
+            with pool.connection():
+                pass
+        except PoolTimeoutError as error:
+            errors.append(error)
+
+    with pool.connection():
+        waiter = threading.Thread(target=acquire)
+        waiter.start()
+        waiter.join(timeout=5)
+    assert len(errors) == 1
+    assert "REVIEW_DB_POOL_SIZE" in str(errors[0])
+
+
+@pytest.mark.parametrize("user_id", ["", "x" * 33, "a b", "../etc", "이름?", None])
+def test_invalid_user_ids_are_rejected(db_path, user_id):
+    with pytest.raises(ValueError):
+        SQLiteNoteStore(db_path, user_id)
+
+
+def test_valid_user_ids_are_accepted(db_path):
+    for user_id in (DEFAULT_USER, "김철수_01", "team.a-1", "x" * 32):
+        assert SQLiteNoteStore(db_path, user_id).count() == 0
@@ -0,0 +1,59 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from scheduler import (
+    DIFFICULTIES,
+    GROWTH_FACTORS,
+    calculate_next_intervals,
+    calculate_next_review_date,
+    calculate_next_review_dates,
+    to_difficulty_codes,
+)
+
+# 범위 밖 코드(-1, 4, 7)는 '전혀 기억나지 않음'으로 처리되어야 함
+CODES = [-1, 0, 1, 2, 3, 4, 7]
+LAST_INTERVALS = [-3, 0, 1, 2, 3, 5, 7, 13, 99, 1000, 36_500]
+FITTED_FACTORS = (2.37, 1.0, 0.21, 0.0)
+
+
+def _difficulty(code):
+    return DIFFICULTIES[code] if 0 <= code < len(DIFFICULTIES) else "알 수 없는 난이도"
+
+
+@pytest.mark.parametrize("growth_factors", [GROWTH_FACTORS, FITTED_FACTORS])
+def test_vectorized_intervals_match_scalar(growth_factors):
+    codes, lasts = np.meshgrid(CODES, LAST_INTERVALS)
+    codes, lasts = codes.ravel(), lasts.ravel()
+    today = date(2026, 10, 17)
+
+    intervals = calculate_next_intervals(codes, lasts, growth_factors)
+    expected = [
+        calculate_next_review_date(today, _difficulty(code), last, growth_factors)[1]
+        for code, last in zip(codes.tolist(), lasts.tolist())
+    ]
+    assert intervals.tolist() == expected
+
+
+@pytest.mark.parametrize("growth_factors", [GROWTH_FACTORS, FITTED_FACTORS])
+def test_vectorized_dates_match_scalar(growth_factors):
+    rng = np.random.default_rng(0)
+    size = 2_000
+    days = rng.integers(date(2020, 1, 1).toordinal(), date(2030, 1, 1).toordinal(), size)
+    current = [date.fromordinal(day) for day in days.tolist()]
+    codes = rng.choice(CODES, size)
+    lasts = rng.choice(LAST_INTERVALS, size)
+
+    next_dates, intervals = calculate_next_review_dates(current, codes, lasts, growth_factors)
+    for i in range(size):
+        expected_date, expected_interval = calculate_next_review_date(
+            current[i], _difficulty(int(codes[i])), int(lasts[i]), growth_factors
+        )
+        assert next_dates[i].astype(object) == expected_date
+        assert intervals[i] == expected_interval
+
+
+def test_difficulty_codes_map_unknown_to_forgot():
+    codes = to_difficulty_codes([*DIFFICULTIES, "알 수 없는 난이도", None])
+    assert codes.tolist() == [0, 1, 2, 3, 3, 3]
@@ -0,0 +1,137 @@
+from datetime import date
+
+import pytest
+
+from notes import FLASHCARD_NOTE_TYPE, QA_NOTE_TYPE, build_note
+from search_index import SearchIndex
+
+TODAY = date(2026, 10, 17)
+
+
+def _note(note_id, title, tags=(), category="", front="", back=""):
+    return build_note(note_id, FLASHCARD_NOTE_TYPE, title, list(tags), category, {"front": front, "back": back}, TODAY)
+
+
+@pytest.fixture
+def notes():
+    return [
+        _note(0, "사과", ["과일"], "영어", "사과는 영어로?", "Apple"),
+        _note(1, "관성", ["물리"], "과학", "관성의 법칙", "운동 상태를 유지하려는 성질"),
+        _note(2, "바나나", ["과일", "열대"], "영어", "바나나는 영어로?", "Banana"),
+        build_note(3, QA_NOTE_TYPE, "뉴턴", ["물리"], "과학", {"question": "운동 제2법칙은?", "answer": "F = ma"}, TODAY),
+        _note(4, "Hello World", ["c"], "프로그래밍", "#include", "헤더 파일 포함"),
+    ]
+
+
+# --- 증분 색인 ---
+def test_incremental_changes_match_rebuilt_index(notes):
+    index = SearchIndex(notes)
+    index.search("과일")  # 결과 캐시가 색인 변경 후에도 남아 있지 않아야 함
+
+    changed = _note(0, "사과", ["과수원"], "영어", "사과는 영어로?", "Apple")
+    index.update(changed)
+    index.update(notes[1])  # 바뀐 필드가 없으면 그대로
+    index.remove(2)
+    index.remove(99)  # 없는 노트는 무시
+    added = _note(5, "포도", ["과일"], "영어", "포도는 영어로?", "Grape")
+    index.add(added)
+
+    current = [changed, notes[1], notes[3], notes[4], added]
+    rebuilt = SearchIndex(current)
+    assert len(index) == len(rebuilt) == 5
+    assert index._docs == rebuilt._docs
+    assert index._postings == rebuilt._postings  # 빈 posting도 남지 않음
+    for query in ("과일", "과", "바나나", "영어", "운동 법칙", "apple"):
+        assert index.search(query) == rebuilt.search(query)
+    assert index.search("과일") == ([5], 1)
+
+
+def test_removing_every_note_empties_postings(notes):
+    index = SearchIndex(notes)
+    for note in notes:
+        index.remove(note["id"])
+    assert len(index) == 0
+    assert not index._postings
+    assert index.search("과") == ([], 0)
+
+
+# --- 검색어 ---
+@pytest.mark.parametrize("query, expected", [
+    ("과", {0, 1, 2, 3}),  # 제목·태그·카테고리 어디든 한 글자 포함
+    ("a", {0, 2, 3}),  # 'Apple', 'Banana', 'F = ma' (소문자로 정규화)
+    ("#", {4}),
+    ("ｂ", {2}),  # 전각 문자도 NFKC로 통일
+    ("뷁", set()),
+])
+def test_single_character_queries(notes, query, expected):
+    ids, total = SearchIndex(notes).search(query)
+    assert set(ids) == expected
+    assert total == len(expected)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("과일 영어", {0, 2}),
+    ("영어 과일", {0, 2}),  # 단어 순서와 무관
+    ("과일 바나나", {2}),
+    ("물리 법칙", {1, 3}),
+    ("운동 ma", {3}),  # 한 글자·두 글자 단어가 섞여도 모두 포함해야 함
+    ("과일 물리", set()),
+    ("  APPLE  ", {0}),
+])
+def test_multi_term_queries_require_every_term(notes, query, expected):
+    ids, total = SearchIndex(notes).search(query)
+    assert set(ids) == expected
+    assert total == len(expected)
+
+
+def test_empty_query_returns_nothing(notes):
+    assert SearchIndex(notes).search("   ") == ([], 0)
+
+
+def test_terms_across_fields_do_not_match_joined_text():
+    # 필드 경계(줄바꿈)와 공백에 걸친 문자열은 일치하지 않음
+    index = SearchIndex([_note(0, "가나", ["다라"], front="마 바")])
+    assert index.search("나다") == ([], 0)
+    assert index.search("마바") == ([], 0)
+    assert index.search("가나 다라 바") == ([0], 1)
+
+
+# --- 순위와 페이지 ---
+def test_ranking_follows_field_weights():
+    notes = [
+        _note(0, "기타", front="별"),  # 내용
+        _note(1, "기타", category="별"),  # 카테고리
+        _note(2, "기타", tags=["별"]),  # 태그
+        _note(3, "별"),  # 제목
+        _note(4, "은하수와 별"),  # 제목이지만 단어 중간
+    ]
+    ids, total = SearchIndex(notes).search("별")
+    assert total == 5
+    assert ids == [3, 4, 2, 1, 0]
+
+
+def test_ranking_adds_scores_of_every_field():
+    notes = [
+        _note(0, "별", front="없음"),  # 제목 6
+        _note(1, "별", tags=["별"], front="별"),  # 제목 6 + 태그 4.5 + 내용 1.5
+        _note(2, "기타", tags=["별"], category="별", front="별"),  # 태그 4.5 + 카테고리 3 + 내용 1.5
+    ]
+    assert SearchIndex(notes).search("별")[0] == [1, 2, 0]
+
+
+def test_pagination_slices_full_ranking():
+    notes = [_note(i, f"단어{i % 7}", tags=["단어"] if i % 3 == 0 else [], front=f"단어 {i}") for i in range(40)]
+    index = SearchIndex(notes)
+    everything, total = index.search("단어")
+    assert total == 40
+    assert sorted(everything) == list(range(40))
+
+    pages = []
+    for offset in range(0, 40, 15):
+        ids, page_total = index.search("단어", offset=offset, limit=15)
+        assert page_total == total
+        pages.extend(ids)
+    assert pages == everything
+    assert index.search("단어", offset=10, limit=5)[0] == everything[10:15]
+    assert index.search("단어", offset=38)[0] == everything[38:]
+    assert index.search("단어", offset=50, limit=10) == ([], 40)